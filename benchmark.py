@@ -0,0 +1,221 @@
+"""性能测试脚本：在合成的大词库上测量存储相关操作的耗时。
+
+用法：python benchmark.py storage --words 100000
+      python benchmark.py review-log --events 2000000
+      python benchmark.py startup --words 100000
+      python benchmark.py snapshot --words 100000
+      python benchmark.py reindex --words 100000 --workers 4
+"""
+import argparse
+import gc
+import os
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+
+from preprocess import DEFAULT_CHUNK_SIZE, build_derived_indexes
+from review_log import ReviewLog
+from snapshot import SnapshotStorage
+from storage import ShardedStorage, SingleFileStorage
+from word_manager import Word, WordManager, WordType
+
+KANA = "あいうえおかきくけこさしすせそたちつてとなにぬねのはひふへほまみむめもやゆよらりるれろわをん"
+KANJI = "日本語学習単語使分代替天意太陽出前事性質条件目的言葉相手"
+
+
+def make_synthetic_words(count: int, seed: int = 0):
+    """生成合成单词列表"""
+    rng = random.Random(seed)
+    types = [word_type.value for word_type in WordType]
+    start = date(2024, 1, 1)
+    words = []
+    for _ in range(count):
+        reading = "".join(rng.choice(KANA) for _ in range(rng.randint(2, 6)))
+        japanese = "".join(rng.choice(KANJI) for _ in range(rng.randint(1, 3)))
+        example = "".join(rng.choice(KANA + KANJI) for _ in range(rng.randint(10, 30)))
+        created = start + timedelta(days=rng.randint(0, 600))
+        words.append(Word(
+            id=str(uuid.UUID(int=rng.getrandbits(128))),
+            japanese=japanese,
+            word_type=rng.choice(types),
+            explanation=f"[{reading}]\n1.释义。\n\n{example}。\n\n例句翻译。",
+            remembered=rng.random() < 0.3,
+            created_time=created.isoformat(),
+            last_review_time=(created + timedelta(days=rng.randint(0, 30))).isoformat(),
+        ))
+    return words
+
+
+def timed(func, repeat: int = 3):
+    """返回多次执行中的最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_storage(word_count: int):
+    words = make_synthetic_words(word_count)
+    work_dir = tempfile.mkdtemp()
+    try:
+        single = SingleFileStorage(os.path.join(work_dir, "words_data.json"))
+        sharded = ShardedStorage(os.path.join(work_dir, "words_data_shards"))
+        single.save(words)
+        sharded.save(words)
+
+        results = [
+            ("单文件 加载", timed(single.load)),
+            ("单文件 保存", timed(lambda: single.save(words))),
+            ("分片 串行加载", timed(ShardedStorage(sharded.directory, executor="serial").load)),
+            ("分片 线程池加载", timed(ShardedStorage(sharded.directory, executor="thread").load)),
+            ("分片 进程池加载", timed(ShardedStorage(sharded.directory, executor="process").load)),
+            ("分片 保存一个脏分片", timed(lambda: sharded.save(words, {WordType.MIMETIC.value}))),
+            ("分片 保存全部", timed(lambda: sharded.save(words, None))),
+        ]
+
+        shutil.rmtree(sharded.directory)
+        start = time.perf_counter()
+        WordManager(single.data_file, sharded=True)
+        results.append(("单文件 -> 分片 迁移", time.perf_counter() - start))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"存储性能（{word_count} 个单词）")
+    for name, seconds in results:
+        print(f"  {name:<20} {seconds * 1000:9.1f} ms")
+
+
+def bench_review_log(event_count: int, word_count: int = 50000):
+    rng = random.Random(0)
+    types = [word_type.value for word_type in WordType]
+    word_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(word_count)]
+    word_types = [rng.choice(types) for _ in range(word_count)]
+    start_day = date(2024, 1, 1)
+    work_dir = tempfile.mkdtemp()
+    try:
+        prefix = os.path.join(work_dir, "words_data_review_log")
+        log = ReviewLog(prefix)
+        session_size = 50
+        start = time.perf_counter()
+        for session in range(event_count // session_size):
+            picks = rng.sample(range(word_count), session_size)
+            log.append([(word_ids[i], word_types[i], rng.random() < 0.7) for i in picks],
+                       log.new_session_id(), start_day + timedelta(days=session // 20))
+        append_seconds = time.perf_counter() - start
+
+        results = [
+            ("追加（每会话一次写入）", append_seconds),
+            ("加载并计算聚合", timed(lambda: ReviewLog(prefix), repeat=1)),
+            ("每日复习数", timed(log.reviews_per_day)),
+            ("各类型记住率", timed(log.retention_by_type)),
+            ("积压量", timed(log.backlog_size)),
+        ]
+        size_mb = os.path.getsize(prefix + ".bin") / 1024 / 1024
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"复习记录性能（{len(log)} 条事件，事件文件 {size_mb:.1f} MB）")
+    for name, seconds in results:
+        print(f"  {name:<20} {seconds * 1000:9.1f} ms")
+
+
+def bench_startup(word_count: int):
+    words = make_synthetic_words(word_count)
+    work_dir = tempfile.mkdtemp()
+    try:
+        data_file = os.path.join(work_dir, "words_data.json")
+        SingleFileStorage(data_file).save(words)
+        results = []
+        for label in ("冷启动（重建索引）", "热启动（读取缓存）"):
+            start = time.perf_counter()
+            manager = WordManager(data_file)
+            ready = time.perf_counter() - start
+            manager.wait_for_indexes()
+            indexed = time.perf_counter() - start
+            manager.close()
+            stats = manager.startup_stats
+            # 释放上一个实例，避免垃圾回收影响下一轮计时
+            del manager
+            gc.collect()
+            results.append((label, stats["index_source"], stats["load_ms"], stats.get("index_ms", 0.0),
+                            ready * 1000, indexed * 1000))
+        cache_mb = os.path.getsize(os.path.join(work_dir, "words_data_index_cache.pickle")) / 1024 / 1024
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"启动性能（{word_count} 个单词，索引缓存 {cache_mb:.1f} MB）")
+    print(f"  {'':<16} {'索引来源':<8} {'加载数据':>9} {'索引':>9} {'可用':>9} {'索引就绪':>9}")
+    for label, source, load_ms, index_ms, ready_ms, indexed_ms in results:
+        print(f"  {label:<16} {source:<8} {load_ms:7.1f}ms {index_ms:7.1f}ms {ready_ms:7.1f}ms {indexed_ms:7.1f}ms")
+
+
+def bench_snapshot(word_count: int):
+    words = make_synthetic_words(word_count)
+    work_dir = tempfile.mkdtemp()
+    try:
+        data_file = os.path.join(work_dir, "words_data.json")
+        results = []
+        for label, storage in (("JSON (indent=2)", SingleFileStorage(data_file)),
+                               ("gzip 快照", SnapshotStorage(data_file, "gzip")),
+                               ("lzma 快照", SnapshotStorage(data_file, "lzma"))):
+            save_seconds = timed(lambda: storage.save(words))
+            load_seconds = timed(storage.load)
+            size_mb = os.path.getsize(storage.data_file) / 1024 / 1024
+            results.append((label, save_seconds, load_seconds, size_mb))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"快照格式对比（{word_count} 个单词）")
+    print(f"  {'':<16} {'保存':>9} {'加载':>9} {'大小':>9}")
+    for label, save_seconds, load_seconds, size_mb in results:
+        print(f"  {label:<16} {save_seconds * 1000:7.1f}ms {load_seconds * 1000:7.1f}ms {size_mb:7.1f}MB")
+
+
+def bench_reindex(word_count: int, workers: int, chunk_size: int):
+    words = make_synthetic_words(word_count)
+    results = []
+    for label, worker_count in (("串行", 1), (f"进程池 ({workers} 进程)", workers)):
+        seconds = timed(lambda: build_derived_indexes(words, worker_count, chunk_size), repeat=1)
+        results.append((label, seconds))
+
+    print(f"索引重建（{word_count} 个单词，每批 {chunk_size} 个，CPU 核数 {os.cpu_count()}）")
+    for label, seconds in results:
+        print(f"  {label:<20} {seconds * 1000:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="日语单词应用性能测试")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    storage_parser = subparsers.add_parser("storage", help="单文件与分片存储的加载/保存耗时")
+    storage_parser.add_argument("--words", type=int, default=100000)
+    log_parser = subparsers.add_parser("review-log", help="复习记录的追加、加载和统计耗时")
+    log_parser.add_argument("--events", type=int, default=2000000)
+    startup_parser = subparsers.add_parser("startup", help="冷启动与热启动（索引缓存）耗时")
+    startup_parser.add_argument("--words", type=int, default=100000)
+    snapshot_parser = subparsers.add_parser("snapshot", help="JSON 与压缩快照的保存/加载耗时和文件大小")
+    snapshot_parser.add_argument("--words", type=int, default=100000)
+    reindex_parser = subparsers.add_parser("reindex", help="串行与进程池重建派生索引的耗时")
+    reindex_parser.add_argument("--words", type=int, default=100000)
+    reindex_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    reindex_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "storage":
+        bench_storage(args.words)
+    elif args.command == "review-log":
+        bench_review_log(args.events)
+    elif args.command == "startup":
+        bench_startup(args.words)
+    elif args.command == "snapshot":
+        bench_snapshot(args.words)
+    elif args.command == "reindex":
+        bench_reindex(args.words, args.workers, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import re
+from dataclasses import dataclass
+from typing import List, Tuple
+
+# 方括号中的假名读音，如 [つかいわける]、[のこす／る]；[ataru] 之类的罗马字不算
+BRACKET_READING = re.compile(r'\[([぀-ヿー・]+(?:[／/][぀-ヿー・]+)*)\]')
+# 只由假名组成的行，如解释首行的 "はつおん"
+KANA_LINE = re.compile(r'^[぀-ヿー]+$')
+# 词性标签，如 【他动词・一段/二类】
+POS_TAG = re.compile(r'【([^】]+)】')
+# 不带【】的独立词性行，如 "他动词・一段/二类"、"名・他动词・サ变/三类"
+POS_LABEL = re.compile(r'^[^\s。，；（(]*(?:动词|名词|形容|副词|连体词|自他)[^\s。，；（(]*$')
+# 编号释义，如 "1.分开使用，适当地使用。"
+SENSE = re.compile(r'^\d+[.．、]\s*(.+)$')
+# 引号或括号中的内容，释义续行中引用或注释的日语不算日语句子，
+# 如 （常用"に連れて"的形式）、待人刻薄。（直進して対象に到達する。）
+QUOTED = re.compile(r'"[^"]*"|“[^”]*”|「[^」]*」|『[^』]*』|（[^）]*）|\([^)]*\)')
+# 平假名或片假名字母（不含 "・" "ー" 等符号），用于区分日语句子和中文翻译
+KANA_CHAR = re.compile(r'[ぁ-ゖァ-ヺ]')
+
+
+@dataclass(frozen=True)
+class ParsedExplanation:
+    """从解释文本中解析出的结构化内容"""
+    readings: Tuple[str, ...] = ()
+    pos_tags: Tuple[str, ...] = ()
+    senses: Tuple[str, ...] = ()
+    definitions: Tuple[Tuple[str, str], ...] = ()  # (日文释义, 中文释义)
+    examples: Tuple[Tuple[str, str], ...] = ()  # (日语例句, 中文翻译)
+
+    @property
+    def reading(self) -> str:
+        return self.readings[0] if self.readings else ""
+
+
+def expand_reading(text: str) -> List[str]:
+    """展开以 "／" 分隔的读音，较短的部分替换第一个读音的词尾，如 "のこす／る" -> のこす、のこる"""
+    parts = [part for part in re.split(r'[／/]', text) if part]
+    if not parts:
+        return []
+    first = parts[0]
+    return [first] + [first[:-len(part)] + part if len(part) < len(first) else part for part in parts[1:]]
+
+
+def _strip_brackets(text: str) -> str:
+    """去掉包住整行翻译的括号，如 "（用纸替代塑料）" """
+    if len(text) > 2 and text[0] in "（(" and text[-1] in "）)":
+        return text[1:-1].strip()
+    return text
+
+
+def parse_explanation(text: str) -> ParsedExplanation:
+    """解析解释文本。
+
+    - 读音：所有 [假名]（"／" 分隔的读音会展开）；没有时取只由假名组成的首行
+    - 词性：所有 【...】，以及不带括号的独立词性行（如 "他动词・一段/二类"）
+    - 释义：以 "1." 等编号开头的行；紧接其后（中间没有空行）、引号和括号外不含假名的行是该释义的续行
+    - 日文释义与例句：含假名的行与其后第一个不含假名的非空行组成一对（日语, 中文），
+      按以下规则区分：
+      * 从词典粘贴的解释中例句行末尾带空格，只要有一行如此，就只把带空格的行当作例句，
+        其余成对的行是日文释义及其中文释义；保存时文本末尾的空白会被去掉，
+        因此位于文本末尾的最后一对总是当作例句
+      * 否则紧跟编号释义之后的第一对是日文释义，其余是例句
+    """
+    readings = {}
+    for match in BRACKET_READING.findall(text):
+        readings.update(dict.fromkeys(expand_reading(match)))
+    pos_tags = dict.fromkeys(tag.strip() for tag in POS_TAG.findall(text))
+    # 保留空行：编号释义的续行以空行结束
+    lines = text.strip().splitlines()
+    if not readings and lines and KANA_LINE.match(lines[0].strip()):
+        readings[lines[0].strip()] = None
+        lines = lines[1:]
+    last_position = len(lines) - 1
+    marked = any(KANA_CHAR.search(line) and line != line.rstrip()
+                 and not BRACKET_READING.search(line) and not POS_TAG.search(line)
+                 and not POS_LABEL.match(line.strip())
+                 for line in lines)
+
+    senses = []
+    definitions = []
+    examples = []
+    pending = None  # 尚未找到中文的日语行：(文本, 是否为例句)
+    after_sense = False
+    in_sense = False  # 上一行是编号释义或其续行
+    for position, raw_line in enumerate(lines):
+        line = raw_line.strip()
+        if not line:
+            in_sense = False
+            continue
+        if BRACKET_READING.search(line) or POS_TAG.search(line):
+            pending = None
+            in_sense = False
+            continue
+        if POS_LABEL.match(line):
+            pos_tags[line] = None
+            pending = None
+            in_sense = False
+            continue
+        match = SENSE.match(line)
+        if match:
+            senses.append(match.group(1))
+            pending = None
+            after_sense = True
+            in_sense = True
+        elif in_sense and not KANA_CHAR.search(QUOTED.sub("", line)):
+            senses[-1] += line
+        elif KANA_CHAR.search(line):
+            in_sense = False
+            # 连续的日语行只取最后一行与中文配对
+            is_example = raw_line != raw_line.rstrip() if marked else not after_sense
+            pending = (line, is_example)
+        elif pending is not None:
+            pair = (pending[0], _strip_brackets(line))
+            is_example = pending[1] or (marked and position == last_position)
+            (examples if is_example else definitions).append(pair)
+            pending = None
+            after_sense = False
+    return ParsedExplanation(tuple(readings), tuple(pos_tags), tuple(senses),
+                             tuple(definitions), tuple(examples))
@@ -0,0 +1,74 @@
+import hashlib
+import os
+import pickle
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from logger import logger
+from search_index import ReadingIndex, SearchIndex, build_indexes
+
+# 派生索引的结构变化时递增，旧缓存会被自动丢弃
+CACHE_VERSION = 4
+
+
+@dataclass
+class DerivedIndexes:
+    """由单词数据派生、可持久化的索引"""
+    search: SearchIndex
+    examples: SearchIndex  # 解释中解析出的例句及翻译
+    readings: ReadingIndex
+
+    @classmethod
+    def build(cls, words: Iterable) -> "DerivedIndexes":
+        return cls(*build_indexes(words))
+
+
+def data_fingerprint(paths: List[str]) -> List[Dict[str, object]]:
+    """数据文件的指纹：每个文件的大小、修改时间和内容哈希"""
+    result = []
+    for path in paths:
+        if not os.path.exists(path):
+            result.append({"path": os.path.basename(path), "missing": True})
+            continue
+        digest = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        stat = os.stat(path)
+        result.append({
+            "path": os.path.basename(path),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "sha1": digest.hexdigest(),
+        })
+    return result
+
+
+class IndexCache:
+    """保存在数据文件旁的派生索引缓存，只有版本和数据文件指纹都一致时才会被使用"""
+
+    def __init__(self, cache_path: str):
+        self.cache_path = cache_path
+
+    def load(self, fingerprint) -> Optional[DerivedIndexes]:
+        if not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = pickle.load(f)
+        except Exception as e:
+            logger.error(f"读取索引缓存失败: {e}")
+            return None
+        if data.get("version") != CACHE_VERSION or data.get("fingerprint") != fingerprint:
+            return None
+        return data["indexes"]
+
+    def save(self, fingerprint, indexes: DerivedIndexes):
+        data = {"version": CACHE_VERSION, "fingerprint": fingerprint, "indexes": indexes}
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            logger.error(f"保存索引缓存失败: {e}")
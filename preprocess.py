@@ -0,0 +1,69 @@
+import multiprocessing
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Sequence
+
+from index_cache import DerivedIndexes
+from logger import logger
+from explanation_parser import parse_explanation
+from search_index import ReadingIndex, build_postings, example_search_text, word_reading, word_search_text
+
+# 发送到子进程的单词文本，只包含建索引需要的字段，减少序列化开销
+WordText = namedtuple("WordText", ["id", "japanese", "explanation"])
+
+DEFAULT_CHUNK_SIZE = 5000
+
+
+def _preprocess_chunk(task):
+    """解析解释、归一化读音并为一批单词构建局部倒排表（槽位为全局编号），可在子进程中执行"""
+    start_slot, rows = task
+    words = [WordText(*row) for row in rows]
+    parsed = [parse_explanation(word.explanation) for word in words]
+    readings = ReadingIndex()
+    for word, word_parsed in zip(words, parsed):
+        readings.set(word.id, word_reading(word, word_parsed))
+    return (build_postings(map(word_search_text, words), start_slot),
+            build_postings(map(example_search_text, parsed), start_slot),
+            readings)
+
+
+def extend_indexes(indexes: DerivedIndexes, words: Sequence, workers: Optional[int] = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> DerivedIndexes:
+    """把单词按 chunk_size 分批预处理后并入 indexes。
+
+    workers 为 None 时使用 CPU 核数；批数多于一批且 workers > 1 时交给进程池并行处理，
+    否则（或进程池不可用时）在当前进程中串行处理。各批结果按顺序合并。
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    start_slot = len(indexes.search.doc_ids)
+    tasks = [(start_slot + start,
+              [(word.id, word.japanese, word.explanation) for word in words[start:start + chunk_size]])
+             for start in range(0, len(words), chunk_size)]
+
+    partials = None
+    if workers > 1 and len(tasks) > 1:
+        try:
+            # 重建通常在后台线程中进行，在多线程进程中 fork 可能死锁，统一使用 spawn（Windows 的默认方式）
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=context) as pool:
+                partials = list(pool.map(_preprocess_chunk, tasks))
+        except Exception as e:
+            logger.error(f"并行预处理失败，改为串行执行: {e}")
+    if partials is None:
+        partials = map(_preprocess_chunk, tasks)
+
+    # 搜索索引和例句索引按相同顺序收录单词，两者的槽位编号一致
+    for (_, rows), (postings, example_postings, readings) in zip(tasks, partials):
+        doc_ids = [row[0] for row in rows]
+        indexes.search.merge_postings(doc_ids, postings)
+        indexes.examples.merge_postings(doc_ids, example_postings)
+        indexes.readings.merge(readings)
+    return indexes
+
+
+def build_derived_indexes(words: Sequence, workers: Optional[int] = None,
+                          chunk_size: int = DEFAULT_CHUNK_SIZE) -> DerivedIndexes:
+    """为全部单词构建派生索引"""
+    return extend_indexes(DerivedIndexes.build(()), words, workers, chunk_size)
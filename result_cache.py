@@ -0,0 +1,50 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+
+class ResultCache:
+    """带代数戳的 LRU 结果缓存。
+
+    每个查询键只保存一份结果及其计算时的代数（generation），
+    读取时代数不一致即视为未命中，因此数据变更后无需主动清空缓存。
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key: Hashable, generation: int, compute: Callable):
+        """命中时返回缓存结果，否则调用 compute 计算并缓存"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == generation:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        value = compute()
+        self._entries[key] = (generation, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, prefix: Hashable = None):
+        """删除键的首元素等于 prefix 的缓存项；不传参数时清空全部"""
+        if prefix is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if isinstance(k, tuple) and k and k[0] == prefix]:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, float]:
+        """返回命中统计"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,171 @@
+import os
+import sys
+from array import array
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from logger import logger
+
+# 每条事件占 4 个小端 uint32：单词序号、日期序数、会话ID、标志位（低8位结果，次8位类型序号）
+FIELDS_PER_EVENT = 4
+OUTCOME_FORGOT = 0
+OUTCOME_REMEMBERED = 1
+
+
+class ReviewLog:
+    """只追加的复习事件日志，按列保存在紧凑数组中。
+
+    事件文件（.bin）为定长记录，加载时整块读入后按步长切片成列；
+    单词ID与类型名保存在只追加的字典文件（.dict）中，事件只记录它们的序号。
+    每日复习数、各类型记住率和待复习积压量在追加时增量维护，查询无需重新聚合。
+    """
+
+    def __init__(self, path_prefix: str):
+        self.events_path = path_prefix + ".bin"
+        self.dict_path = path_prefix + ".dict"
+
+        self.word_ids: List[str] = []
+        self.word_index: Dict[str, int] = {}
+        self.type_names: List[str] = []
+        self.type_index: Dict[str, int] = {}
+
+        self.word_col = array('I')
+        self.day_col = array('I')
+        self.session_col = array('I')
+        self.outcome_col = array('B')
+        self.type_col = array('B')
+
+        self._per_day: Counter = Counter()
+        self._per_type: Counter = Counter()  # (类型序号, 结果) -> 次数
+        self._last_outcome: Dict[int, int] = {}  # 单词序号 -> 最近一次结果
+        self._backlog = 0
+        self.last_session_id = 0
+
+        self.load()
+
+    def __len__(self):
+        return len(self.day_col)
+
+    def load(self):
+        """读取字典文件和事件文件，并一次性计算聚合值"""
+        try:
+            if os.path.exists(self.dict_path):
+                with open(self.dict_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        kind, _, value = line.rstrip('\n').partition('\t')
+                        if kind == 'w':
+                            self.word_index[value] = len(self.word_ids)
+                            self.word_ids.append(value)
+                        elif kind == 't':
+                            self.type_index[value] = len(self.type_names)
+                            self.type_names.append(value)
+
+            if os.path.exists(self.events_path):
+                raw = array('I')
+                with open(self.events_path, 'rb') as f:
+                    data = f.read()
+                # 忽略写入中断留下的不完整记录
+                record_size = FIELDS_PER_EVENT * raw.itemsize
+                raw.frombytes(data[:len(data) - len(data) % record_size])
+                if sys.byteorder == 'big':
+                    raw.byteswap()
+                self.word_col = raw[0::FIELDS_PER_EVENT]
+                self.day_col = raw[1::FIELDS_PER_EVENT]
+                self.session_col = raw[2::FIELDS_PER_EVENT]
+                # 文件为小端序，标志位的第1、2字节分别是结果和类型序号
+                self.outcome_col = array('B', data[12:len(raw) * raw.itemsize:record_size])
+                self.type_col = array('B', data[13:len(raw) * raw.itemsize:record_size])
+        except Exception as e:
+            logger.error(f"加载复习记录失败: {e}")
+
+        self._per_day = Counter(self.day_col)
+        self._per_type = Counter(zip(self.type_col, self.outcome_col))
+        self._last_outcome = dict(zip(self.word_col, self.outcome_col))
+        self._backlog = sum(1 for outcome in self._last_outcome.values() if outcome == OUTCOME_FORGOT)
+        self.last_session_id = max(self.session_col) if self.session_col else 0
+
+    def new_session_id(self) -> int:
+        """分配一个新的会话ID"""
+        self.last_session_id += 1
+        return self.last_session_id
+
+    def _intern(self, kind: str, value: str, values: List[str], index: Dict[str, int], lines: List[str]) -> int:
+        if value not in index:
+            index[value] = len(values)
+            values.append(value)
+            lines.append(f"{kind}\t{value}\n")
+        return index[value]
+
+    def append(self, events: Iterable[Tuple[str, str, bool]], session_id: int, day: Optional[date] = None):
+        """追加一批事件，每个事件为 (单词ID, 单词类型, 是否记住)，整批只写一次文件"""
+        events = list(events)
+        # 先检查类型数量再登记任何序号，避免内存中的字典多出未写入文件的条目
+        new_types = {word_type for _, word_type, _ in events if word_type not in self.type_index}
+        if len(self.type_names) + len(new_types) > 0x100:
+            raise ValueError("复习记录最多支持 256 种单词类型")
+        day_ordinal = (day or date.today()).toordinal()
+        new_dict_lines: List[str] = []
+        raw = array('I')
+        for word_id, word_type, remembered in events:
+            word_idx = self._intern('w', word_id, self.word_ids, self.word_index, new_dict_lines)
+            type_idx = self._intern('t', word_type, self.type_names, self.type_index, new_dict_lines)
+            outcome = OUTCOME_REMEMBERED if remembered else OUTCOME_FORGOT
+            raw.extend((word_idx, day_ordinal, session_id, outcome | (type_idx << 8)))
+
+            self.word_col.append(word_idx)
+            self.day_col.append(day_ordinal)
+            self.session_col.append(session_id)
+            self.outcome_col.append(outcome)
+            self.type_col.append(type_idx)
+
+            self._per_day[day_ordinal] += 1
+            self._per_type[(type_idx, outcome)] += 1
+            previous = self._last_outcome.get(word_idx)
+            self._backlog += (outcome == OUTCOME_FORGOT) - (previous == OUTCOME_FORGOT)
+            self._last_outcome[word_idx] = outcome
+
+        self.last_session_id = max(self.last_session_id, session_id)
+        if not raw:
+            return
+        if sys.byteorder == 'big':
+            raw.byteswap()
+        # 先写字典再写事件，保证事件引用的序号总能被解析
+        if new_dict_lines:
+            with open(self.dict_path, 'a', encoding='utf-8') as f:
+                f.writelines(new_dict_lines)
+        with open(self.events_path, 'ab') as f:
+            f.write(raw.tobytes())
+
+    def reviews_per_day(self, start: Optional[date] = None, end: Optional[date] = None) -> List[Tuple[date, int]]:
+        """按日期返回复习次数"""
+        low = start.toordinal() if start else 0
+        high = end.toordinal() if end else sys.maxsize
+        return [(date.fromordinal(day), count) for day, count in sorted(self._per_day.items())
+                if low <= day <= high]
+
+    def retention_by_type(self) -> Dict[str, float]:
+        """返回各类型的记住率"""
+        totals: Counter = Counter()
+        remembered: Counter = Counter()
+        for (type_idx, outcome), count in self._per_type.items():
+            totals[type_idx] += count
+            if outcome == OUTCOME_REMEMBERED:
+                remembered[type_idx] += count
+        return {self.type_names[type_idx]: remembered[type_idx] / total
+                for type_idx, total in totals.items()}
+
+    def backlog_size(self, existing_ids=None) -> int:
+        """最近一次复习结果为未记住的单词数；传入 existing_ids 时只统计仍存在的单词"""
+        if existing_ids is None:
+            return self._backlog
+        return sum(1 for word_idx, outcome in self._last_outcome.items()
+                   if outcome == OUTCOME_FORGOT and self.word_ids[word_idx] in existing_ids)
+
+    def word_history(self, word_id: str) -> List[Tuple[date, bool, int]]:
+        """返回某个单词的全部复习记录 (日期, 是否记住, 会话ID)"""
+        word_idx = self.word_index.get(word_id)
+        if word_idx is None:
+            return []
+        return [(date.fromordinal(self.day_col[i]), self.outcome_col[i] == OUTCOME_REMEMBERED, self.session_col[i])
+                for i, idx in enumerate(self.word_col) if idx == word_idx]
@@ -0,0 +1,239 @@
+import heapq
+import json
+import math
+import os
+import random
+from abc import ABC, abstractmethod
+from array import array
+from datetime import date
+from typing import Dict, List, Optional
+
+from logger import logger
+
+
+class Scheduler(ABC):
+    """复习调度器基类。
+
+    每个单词的调度状态按字段保存在紧凑数组中（FIELDS 定义字段名、类型码和初始值），
+    单词ID通过 slots 映射到数组下标。select 在一次遍历中算出到期队列，
+    apply_answers 把整个会话的答题结果作为一批更新，save 一次性持久化。
+    """
+
+    name = ""
+    FIELDS = (("due", 'i', 0), ("interval", 'f', 0.0), ("reps", 'I', 0))
+
+    def __init__(self, state_path: Optional[str] = None):
+        self.state_path = state_path
+        self.slots: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self.columns = {name: array(code) for name, code, _ in self.FIELDS}
+        self.load()
+
+    def load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.ids = data["ids"]
+            self.slots = {word_id: slot for slot, word_id in enumerate(self.ids)}
+            for name, code, _ in self.FIELDS:
+                self.columns[name] = array(code, data["fields"][name])
+        except Exception as e:
+            logger.error(f"加载复习计划失败: {e}")
+            self.ids, self.slots = [], {}
+            self.columns = {name: array(code) for name, code, _ in self.FIELDS}
+
+    def save(self, existing_ids=None):
+        """保存调度状态；传入 existing_ids 时丢弃已删除单词的状态"""
+        if not self.state_path:
+            return
+        keep = [slot for slot, word_id in enumerate(self.ids) if existing_ids is None or word_id in existing_ids]
+        data = {
+            "scheduler": self.name,
+            "ids": [self.ids[slot] for slot in keep],
+            "fields": {name: [self.columns[name][slot] for slot in keep] for name, _, _ in self.FIELDS},
+        }
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _slot(self, word_id: str) -> int:
+        slot = self.slots.get(word_id)
+        if slot is None:
+            slot = len(self.ids)
+            self.slots[word_id] = slot
+            self.ids.append(word_id)
+            for name, _, initial in self.FIELDS:
+                self.columns[name].append(initial)
+        return slot
+
+    @staticmethod
+    def _initial_due(word) -> int:
+        """从未按本调度器复习过的单词，以上次复习（或添加）日期作为到期日"""
+        try:
+            return date.fromisoformat(word.last_review_time or word.created_time).toordinal()
+        except (ValueError, TypeError):
+            return 0
+
+    def select(self, words: List, count: int, today: date) -> List:
+        """返回到期最久的 count 个单词；没有到期单词时返回即将到期的单词"""
+        due_col = self.columns["due"]
+        slots = self.slots
+        keyed = []
+        for position, word in enumerate(words):
+            slot = slots.get(word.id)
+            due = due_col[slot] if slot is not None else self._initial_due(word)
+            keyed.append((due, position, word))
+        return [word for _, _, word in heapq.nsmallest(count, keyed)]
+
+    def apply_answers(self, answers: Dict[str, bool], today: date):
+        """批量应用一次会话的答题结果 {单词ID: 是否记住}"""
+        today_ordinal = today.toordinal()
+        for word_id, remembered in answers.items():
+            self._update(self._slot(word_id), remembered, today_ordinal)
+
+    @abstractmethod
+    def _update(self, slot: int, remembered: bool, today: int):
+        """根据一次答题结果更新 slot 的调度状态，today 为日期序数"""
+
+
+class HeuristicScheduler(Scheduler):
+    """原有的复习算法：得分 = 距上次复习天数 + 未记住额外加 7 分，不保存额外状态"""
+
+    name = "heuristic"
+    FIELDS = ()
+
+    def save(self, existing_ids=None):
+        pass
+
+    def select(self, words: List, count: int, today: date) -> List:
+        """如果得分最高的单词超过指定数量，则从相同分数的单词中随机选择"""
+        word_scores = []
+        for word in words:
+            try:
+                review_date_str = word.last_review_time or word.created_time
+                review_date = date.fromisoformat(review_date_str)
+                days_diff = (today - review_date).days
+            except (ValueError, TypeError):
+                days_diff = 365
+
+            x = 7 if not word.remembered else 0
+            score = days_diff + x
+            word_scores.append((score, word))
+
+        word_scores.sort(key=lambda x: x[0], reverse=True)
+
+        if len(word_scores) <= count:
+            return [word for score, word in word_scores]
+
+        words_by_score = {}
+        for score, word in word_scores:
+            if score not in words_by_score:
+                words_by_score[score] = []
+            words_by_score[score].append(word)
+
+        result_words = []
+        sorted_scores = sorted(words_by_score.keys(), reverse=True)
+
+        for score in sorted_scores:
+            words_in_group = words_by_score[score]
+            if len(result_words) + len(words_in_group) < count:
+                result_words.extend(words_in_group)
+            else:
+                num_to_add = count - len(result_words)
+                result_words.extend(random.sample(words_in_group, num_to_add))
+                break
+
+        return result_words
+
+    def apply_answers(self, answers: Dict[str, bool], today: date):
+        # 复习时间和记住状态保存在单词本身，无需额外状态，也不为单词分配槽位
+        pass
+
+    def _update(self, slot: int, remembered: bool, today: int):
+        pass
+
+
+class SM2Scheduler(Scheduler):
+    """SM-2 算法：记住按质量 4、未记住按质量 2 计算"""
+
+    name = "sm2"
+    FIELDS = (("due", 'i', 0), ("interval", 'f', 0.0), ("reps", 'I', 0), ("ease", 'f', 2.5))
+
+    def _update(self, slot: int, remembered: bool, today: int):
+        quality = 4 if remembered else 2
+        reps, interval, ease = self.columns["reps"], self.columns["interval"], self.columns["ease"]
+        if quality >= 3:
+            if reps[slot] == 0:
+                interval[slot] = 1
+            elif reps[slot] == 1:
+                interval[slot] = 6
+            else:
+                interval[slot] = round(interval[slot] * ease[slot])
+            reps[slot] += 1
+        else:
+            reps[slot] = 0
+            interval[slot] = 1
+        ease[slot] = max(1.3, ease[slot] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        self.columns["due"][slot] = today + int(interval[slot])
+
+
+class FSRSScheduler(Scheduler):
+    """FSRS 风格的记忆模型：维护稳定性与难度，按目标记住率计算间隔。
+
+    参数为 FSRS-4.5 的默认权重，记住按 Good(3)、未记住按 Again(1) 计算。
+    """
+
+    name = "fsrs"
+    FIELDS = (("due", 'i', 0), ("interval", 'f', 0.0), ("reps", 'I', 0),
+              ("stability", 'f', 0.0), ("difficulty", 'f', 0.0), ("last", 'i', 0))
+    WEIGHTS = (0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+               0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755)
+    DECAY = -0.5
+    FACTOR = 19 / 81
+
+    def __init__(self, state_path: Optional[str] = None, desired_retention: float = 0.9):
+        self.desired_retention = desired_retention
+        super().__init__(state_path)
+
+    def _initial_difficulty(self, rating: int) -> float:
+        w = self.WEIGHTS
+        return min(10.0, max(1.0, w[4] - (rating - 3) * w[5]))
+
+    def _update(self, slot: int, remembered: bool, today: int):
+        w = self.WEIGHTS
+        rating = 3 if remembered else 1
+        stability, difficulty = self.columns["stability"], self.columns["difficulty"]
+        if self.columns["reps"][slot] == 0:
+            stability[slot] = w[rating - 1]
+            difficulty[slot] = self._initial_difficulty(rating)
+        else:
+            elapsed = max(0, today - self.columns["last"][slot])
+            s, d = stability[slot], difficulty[slot]
+            retrievability = (1 + self.FACTOR * elapsed / s) ** self.DECAY
+            if remembered:
+                s = s * (math.exp(w[8]) * (11 - d) * s ** -w[9] * (math.exp(w[10] * (1 - retrievability)) - 1) + 1)
+            else:
+                s = w[11] * d ** -w[12] * ((s + 1) ** w[13] - 1) * math.exp(w[14] * (1 - retrievability))
+            d = d - w[6] * (rating - 3)
+            d = w[7] * self._initial_difficulty(3) + (1 - w[7]) * d
+            stability[slot], difficulty[slot] = s, min(10.0, max(1.0, d))
+
+        interval = stability[slot] / self.FACTOR * (self.desired_retention ** (1 / self.DECAY) - 1)
+        self.columns["interval"][slot] = max(1, round(interval))
+        self.columns["reps"][slot] += 1
+        self.columns["last"][slot] = today
+        self.columns["due"][slot] = today + int(self.columns["interval"][slot])
+
+
+SCHEDULERS = {scheduler.name: scheduler for scheduler in (HeuristicScheduler, SM2Scheduler, FSRSScheduler)}
+
+
+def create_scheduler(name: str, state_prefix: Optional[str] = None) -> Scheduler:
+    """按名称创建调度器，状态文件为 <state_prefix>_<name>.json"""
+    if name not in SCHEDULERS:
+        raise ValueError(f"不支持的复习算法: {name}")
+    state_path = f"{state_prefix}_{name}.json" if state_prefix else None
+    return SCHEDULERS[name](state_path)
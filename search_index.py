@@ -0,0 +1,196 @@
+import re
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from explanation_parser import BRACKET_READING, ParsedExplanation, expand_reading, parse_explanation
+from utils import normalize_text
+
+KANA_TOKEN = re.compile(r'^[぀-ヿー]+$')
+# 汉字后直接接读音的写法，如 "代替だいたい"
+KANJI_WITH_READING = re.compile(r'^([一-鿿々〆]+)([ぁ-ゖー]+)$')
+
+
+def word_search_text(word) -> str:
+    """search_words 匹配的文本（与原有的不区分大小写子串匹配保持一致）"""
+    return f"{word.japanese}\n{word.explanation}".lower()
+
+
+def example_search_text(parsed: ParsedExplanation) -> str:
+    """例句索引匹配的文本：全部例句及其翻译"""
+    return "\n".join(f"{japanese}\n{chinese}" for japanese, chinese in parsed.examples).lower()
+
+
+def word_reading(word, parsed: Optional[ParsedExplanation] = None) -> str:
+    """提取单词读音，依次尝试：
+    解释中的读音（见 parse_explanation）、日语栏中的 [读音]、日语栏中独立的假名部分、
+    日语栏首个词中紧跟在汉字后的假名。最后一种难以与送假名区分（如 "食べる"、"恥ずかしい"），
+    因此只在至少两个汉字、且假名不少于汉字数的两倍时采用。
+    """
+    if parsed is None:
+        parsed = parse_explanation(word.explanation)
+    if parsed.reading:
+        return parsed.reading
+    match = BRACKET_READING.search(word.japanese)
+    if match:
+        return expand_reading(match.group(1))[0]
+    tokens = word.japanese.replace('　', ' ').split()
+    for position, token in enumerate(tokens):
+        # 如 "太陽　たいよう"；跳过 "代替 する" 中的 "する"
+        if KANA_TOKEN.match(token) and (position == 0 or token != "する"):
+            return token
+    match = KANJI_WITH_READING.match(tokens[0]) if tokens else None
+    if match and len(match.group(1)) >= 2 and len(match.group(2)) >= 2 * len(match.group(1)):
+        return match.group(2)
+    return ""
+
+
+def _grams(text: str) -> Set[str]:
+    """文本中所有单字和双字片段"""
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+class SearchIndex:
+    """单字与双字倒排索引，用于快速缩小子串搜索的候选范围。
+
+    查询结果是候选集（必然包含所有匹配项），调用方仍需做一次子串校验。
+    删除文档时需要传入建索引时的原文本。文档ID在内部映射为整数槽位；
+    序列化时倒排表保存为紧凑数组，加载后在首次访问某个片段时才转换回集合。
+    """
+
+    def __init__(self):
+        self.doc_ids: List[Optional[str]] = []
+        self.doc_slots: Dict[str, int] = {}
+        self.postings: Dict[str, object] = {}  # 片段 -> set 或 array('I')
+
+    def __getstate__(self):
+        postings = {gram: array('I', sorted(posting)) if isinstance(posting, set) else posting
+                    for gram, posting in self.postings.items()}
+        return {"doc_ids": self.doc_ids, "postings": postings}
+
+    def __setstate__(self, state):
+        self.doc_ids = state["doc_ids"]
+        self.doc_slots = {doc_id: slot for slot, doc_id in enumerate(self.doc_ids) if doc_id is not None}
+        self.postings = state["postings"]
+
+    def _posting(self, gram: str) -> Optional[Set[int]]:
+        posting = self.postings.get(gram)
+        if posting is not None and not isinstance(posting, set):
+            posting = self.postings[gram] = set(posting)
+        return posting
+
+    def add(self, doc_id: str, text: str):
+        slot = self.doc_slots.get(doc_id)
+        if slot is None:
+            slot = self.doc_slots[doc_id] = len(self.doc_ids)
+            self.doc_ids.append(doc_id)
+        for gram in _grams(text):
+            posting = self._posting(gram)
+            if posting is None:
+                self.postings[gram] = {slot}
+            else:
+                posting.add(slot)
+
+    def remove(self, doc_id: str, text: str):
+        slot = self.doc_slots.pop(doc_id, None)
+        if slot is None:
+            return
+        self.doc_ids[slot] = None
+        for gram in _grams(text):
+            posting = self._posting(gram)
+            if posting is not None:
+                posting.discard(slot)
+                if not posting:
+                    del self.postings[gram]
+
+    def merge_postings(self, doc_ids: List[str], postings: Dict[str, array]):
+        """合并由 build_postings 并行构建的倒排表，槽位从当前文档数开始连续编号"""
+        for doc_id in doc_ids:
+            self.doc_slots[doc_id] = len(self.doc_ids)
+            self.doc_ids.append(doc_id)
+        for gram, slots in postings.items():
+            posting = self.postings.get(gram)
+            if posting is None:
+                self.postings[gram] = slots
+            elif isinstance(posting, set):
+                posting.update(slots)
+            else:
+                posting.extend(slots)
+
+    def candidates(self, keyword: str) -> Set[str]:
+        """返回可能包含 keyword 的文档ID集合"""
+        if len(keyword) <= 2:
+            slots = self._posting(keyword) or ()
+        else:
+            postings = [self._posting(keyword[i:i + 2]) for i in range(len(keyword) - 1)]
+            if not all(postings):
+                return set()
+            postings.sort(key=len)
+            slots = set(postings[0])
+            for posting in postings[1:]:
+                slots &= posting
+                if not slots:
+                    break
+        return {self.doc_ids[slot] for slot in slots}
+
+
+class ReadingIndex:
+    """归一化读音索引，支持按读音前缀查找"""
+
+    def __init__(self):
+        self.keys: Dict[str, str] = {}
+        self._sorted: Optional[List[Tuple[str, str]]] = None
+
+    def set(self, doc_id: str, reading: str):
+        key = normalize_text(reading)
+        if key:
+            self.keys[doc_id] = key
+        else:
+            self.keys.pop(doc_id, None)
+        self._sorted = None
+
+    def remove(self, doc_id: str):
+        if self.keys.pop(doc_id, None) is not None:
+            self._sorted = None
+
+    def merge(self, other: "ReadingIndex"):
+        self.keys.update(other.keys)
+        self._sorted = None
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        """返回读音以 prefix 开头的文档ID（按读音排序）"""
+        if self._sorted is None:
+            self._sorted = sorted((key, doc_id) for doc_id, key in self.keys.items())
+        prefix = normalize_text(prefix)
+        result = []
+        position = bisect_left(self._sorted, (prefix, ""))
+        while position < len(self._sorted) and self._sorted[position][0].startswith(prefix):
+            result.append(self._sorted[position][1])
+            position += 1
+        return result
+
+
+def build_postings(texts: Iterable[str], start_slot: int) -> Dict[str, array]:
+    """为一批文本构建数组形式的倒排表，第 i 个文本的槽位为 start_slot + i"""
+    postings: Dict[str, array] = {}
+    for slot, text in enumerate(texts, start_slot):
+        for gram in _grams(text):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = array('I', (slot,))
+            else:
+                posting.append(slot)
+    return postings
+
+
+def build_indexes(words: Iterable) -> Tuple[SearchIndex, SearchIndex, ReadingIndex]:
+    """为一批单词构建搜索索引、例句索引和读音索引"""
+    search, examples, readings = SearchIndex(), SearchIndex(), ReadingIndex()
+    for word in words:
+        parsed = parse_explanation(word.explanation)
+        search.add(word.id, word_search_text(word))
+        examples.add(word.id, example_search_text(parsed))
+        readings.set(word.id, word_reading(word, parsed))
+    return search, examples, readings
@@ -0,0 +1,92 @@
+import gzip
+import json
+import lzma
+import os
+from itertools import islice
+from dataclasses import fields
+from typing import Iterable, Iterator, List, Optional, Set
+
+# 压缩格式 -> (打开函数, 文件扩展名, 写入时的压缩参数)
+COMPRESSIONS = {
+    "gzip": (gzip.open, ".jwl.gz", {"compresslevel": 6}),
+    "lzma": (lzma.open, ".jwl.xz", {"preset": 2}),
+}
+SNAPSHOT_VERSION = 1
+# 写入和解析时每批处理的行数
+WRITE_BATCH_LINES = 1000
+
+
+def compression_for_path(path: str) -> str:
+    """根据扩展名判断压缩格式"""
+    for name, (_, extension, _) in COMPRESSIONS.items():
+        if path.endswith(extension):
+            return name
+    raise ValueError(f"无法识别的快照格式: {path}")
+
+
+def write_snapshot(path: str, words: Iterable, compression: Optional[str] = None):
+    """以流式压缩写入快照。
+
+    第一行是包含字段名的表头，之后每行是一个单词的字段值数组，
+    字段名只出现一次；逐行写入压缩流，完整的未压缩文本不会出现在内存中。
+    """
+    open_func, _, options = COMPRESSIONS[compression or compression_for_path(path)]
+    tmp_path = path + ".tmp"
+    with open_func(tmp_path, 'wt', encoding='utf-8', **options) as f:
+        field_names = None
+        lines = []
+        for word in words:
+            if field_names is None:
+                field_names = [item.name for item in fields(word)]
+                lines.append(json.dumps({"version": SNAPSHOT_VERSION, "fields": field_names}))
+            lines.append(json.dumps([getattr(word, name) for name in field_names], ensure_ascii=False))
+            if len(lines) >= WRITE_BATCH_LINES:
+                f.write("\n".join(lines) + "\n")
+                lines = []
+        if field_names is None:
+            lines.append(json.dumps({"version": SNAPSHOT_VERSION, "fields": []}))
+        if lines:
+            f.write("\n".join(lines) + "\n")
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str, compression: Optional[str] = None) -> Iterator[dict]:
+    """流式读取快照，逐个返回单词字段字典"""
+    open_func = COMPRESSIONS[compression or compression_for_path(path)][0]
+    with open_func(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"不支持的快照版本: {header.get('version')}")
+        field_names = header["fields"]
+        # 按批解析，减少逐行调用 json.loads 的开销
+        while True:
+            batch = list(islice(f, WRITE_BATCH_LINES))
+            if not batch:
+                break
+            lines = [line for line in batch if line.strip()]
+            for row in json.loads("[" + ",".join(lines) + "]"):
+                yield dict(zip(field_names, row))
+
+
+class SnapshotStorage:
+    """压缩快照存储：与 SingleFileStorage 接口相同，数据保存为压缩的按行快照"""
+
+    def __init__(self, data_file: str, compression: str = "gzip"):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"不支持的压缩格式: {compression}")
+        self.compression = compression
+        self.data_file = os.path.splitext(data_file)[0] + COMPRESSIONS[compression][1]
+
+    def exists(self) -> bool:
+        return os.path.exists(self.data_file)
+
+    def source_files(self) -> List[str]:
+        return [self.data_file]
+
+    def load(self) -> List[dict]:
+        if not self.exists():
+            return []
+        return list(read_snapshot(self.data_file, self.compression))
+
+    def save(self, words: Iterable, dirty_types: Optional[Set[str]] = None):
+        write_snapshot(self.data_file, words, self.compression)
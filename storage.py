@@ -0,0 +1,148 @@
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from logger import logger
+
+
+def _write_json_atomic(path: str, data, indent: Optional[int] = 2):
+    """先写入临时文件再替换，避免保存中断导致文件损坏"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str):
+    """读取一个JSON文件（进程池中执行时需要是模块级函数）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class SingleFileStorage:
+    """单文件存储：全部单词保存在一个JSON列表中"""
+
+    def __init__(self, data_file: str):
+        self.data_file = data_file
+
+    def exists(self) -> bool:
+        return os.path.exists(self.data_file)
+
+    def source_files(self) -> List[str]:
+        return [self.data_file]
+
+    def load(self) -> List[dict]:
+        if not self.exists():
+            return []
+        return _read_json(self.data_file)
+
+    def save(self, words: Iterable, dirty_types: Optional[Set[str]] = None):
+        with open(self.data_file, 'w', encoding='utf-8') as f:
+            json.dump([asdict(word) for word in words], f, ensure_ascii=False, indent=2)
+
+
+class ShardedStorage:
+    """分片存储：每种单词类型一个JSON文件，并用清单文件记录类型与文件的对应关系。
+
+    保存时只重写有变更的分片。加载默认逐个串行解析：JSON 解析受 GIL 限制，线程池没有加速，
+    进程池的序列化开销又大于收益；executor 设为 "thread" 或 "process" 时改用对应的池并行解析。
+    """
+
+    MANIFEST = "manifest.json"
+    VERSION = 1
+
+    def __init__(self, directory: str, workers: Optional[int] = None, executor: str = "serial"):
+        if executor not in ("thread", "process", "serial"):
+            raise ValueError(f"不支持的执行方式: {executor}")
+        self.directory = directory
+        self.workers = workers
+        self.executor = executor
+        self.shards: Dict[str, str] = {}  # 单词类型 -> 分片文件名
+        # 内容已成功读入内存（或由本实例写入）的分片类型，只有这些分片才会因类型为空而被删除
+        self.loaded_types: Set[str] = set()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, self.MANIFEST)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.manifest_path)
+
+    def source_files(self) -> List[str]:
+        return [self.manifest_path] + [os.path.join(self.directory, name) for name in self.shards.values()]
+
+    def _shard_file_name(self, word_type: str) -> str:
+        """为类型生成唯一且可用作文件名的分片名，如 "vt/vi" -> "vt_vi.json" """
+        if word_type in self.shards:
+            return self.shards[word_type]
+        base = re.sub(r'[\\/:*?"<>|\s.]', '_', word_type) or "_"
+        name = f"{base}.json"
+        used = set(self.shards.values())
+        suffix = 1
+        while name in used or name == self.MANIFEST:
+            suffix += 1
+            name = f"{base}_{suffix}.json"
+        return name
+
+    def load(self) -> List[dict]:
+        if not self.exists():
+            return []
+        manifest = _read_json(self.manifest_path)
+        self.shards = {shard["type"]: shard["file"] for shard in manifest["shards"]}
+        self.loaded_types = set()
+        paths = [os.path.join(self.directory, file_name) for file_name in self.shards.values()]
+
+        if self.executor == "serial" or len(paths) <= 1:
+            results = [_read_json(path) for path in paths]
+        else:
+            pool_class = ProcessPoolExecutor if self.executor == "process" else ThreadPoolExecutor
+            with pool_class(max_workers=self.workers) as pool:
+                results = list(pool.map(_read_json, paths))
+
+        data = []
+        for shard_data in results:
+            data.extend(shard_data)
+        self.loaded_types = set(self.shards)
+        return data
+
+    def save(self, words: Iterable, dirty_types: Optional[Set[str]] = None):
+        """保存分片；dirty_types 为 None 时重写全部分片"""
+        os.makedirs(self.directory, exist_ok=True)
+        by_type: Dict[str, List] = {}
+        for word in words:
+            by_type.setdefault(word.word_type, []).append(word)
+
+        if dirty_types is None:
+            dirty_types = set(by_type) | set(self.shards)
+
+        for word_type in dirty_types:
+            shard_words = by_type.get(word_type)
+            if shard_words:
+                file_name = self._shard_file_name(word_type)
+                self.shards[word_type] = file_name
+                _write_json_atomic(os.path.join(self.directory, file_name),
+                                   [asdict(word) for word in shard_words])
+                self.loaded_types.add(word_type)
+            elif word_type in self.shards and word_type not in self.loaded_types:
+                # 分片内容从未成功读入内存，内存中没有该类型不代表单词已被删除
+                logger.error(f"分片 {self.shards[word_type]} 未加载，跳过删除")
+            elif word_type in self.shards:
+                # 该类型已没有单词，删除分片
+                file_name = self.shards.pop(word_type)
+                self.loaded_types.discard(word_type)
+                try:
+                    os.remove(os.path.join(self.directory, file_name))
+                except OSError as e:
+                    logger.error(f"删除分片失败: {e}")
+
+        manifest = {
+            "version": self.VERSION,
+            "shards": [
+                {"type": word_type, "file": file_name, "count": len(by_type.get(word_type, ()))}
+                for word_type, file_name in self.shards.items()
+            ],
+        }
+        _write_json_atomic(self.manifest_path, manifest)
@@ -0,0 +1,147 @@
+import json
+import os
+import platform
+import uuid
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from logger import logger
+
+
+def record_stamp(record: dict) -> Tuple:
+    """变更记录的全序比较键：逻辑时钟、修改时间，最后以内容决胜，保证两端得出相同结论"""
+    if record["deleted"]:
+        return (record["clock"], record["time"], "")
+    word = record["word"]
+    return (word.get("modified_clock", 0), word.get("modified_time", ""),
+            json.dumps(word, ensure_ascii=False, sort_keys=True))
+
+
+class SyncState:
+    """单个存储的同步状态，保存在数据文件旁的 _sync.json 中。
+
+    - seq：本地变更序号，本地修改和接受的远端修改都会分配新的序号
+    - changes：单词ID -> 最近一次变更的序号，按序号可以只取出某个时间点之后的变更
+    - tombstones：已删除单词的 (逻辑时钟, 修改时间)
+    - peers：对端存储ID -> 对端已包含的本地变更的最大序号
+    - location：保存时所在的机器和路径。整个目录被复制到别处（如另一台电脑）后，
+      副本与原存储会有相同的ID，对端按ID记录的水位会互相混淆，因此在新位置加载时
+      为副本分配新的ID；副本的序号历史与原存储相同，继承的 peers 仍然有效
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.store_id = str(uuid.uuid4())
+        self.seq = 0
+        self.changes: Dict[str, int] = {}
+        self.tombstones: Dict[str, Tuple[int, str]] = {}
+        self.peers: Dict[str, int] = {}
+        self._log: List[Tuple[int, str]] = []  # (序号, 单词ID)，按序号递增
+        self.is_new = True
+        self.location = f"{platform.node()}:{os.path.abspath(path)}"
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.store_id = data["store_id"]
+            self.seq = data["seq"]
+            self.changes = data["changes"]
+            self.tombstones = {word_id: tuple(stamp) for word_id, stamp in data["tombstones"].items()}
+            self.peers = data["peers"]
+            self._log = sorted((seq, word_id) for word_id, seq in self.changes.items())
+            self.is_new = False
+            if data.get("location", self.location) != self.location:
+                self.store_id = str(uuid.uuid4())
+        except Exception as e:
+            logger.error(f"加载同步状态失败: {e}")
+
+    def save(self):
+        data = {
+            "store_id": self.store_id,
+            "seq": self.seq,
+            "changes": self.changes,
+            "tombstones": self.tombstones,
+            "peers": self.peers,
+            "location": self.location,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self.is_new = False
+
+    def record_change(self, word_id: str):
+        self.seq += 1
+        self.changes[word_id] = self.seq
+        self._log.append((self.seq, word_id))
+
+    def changed_since(self, seq: int) -> List[str]:
+        """返回序号大于 seq 的变更单词ID，耗时与变更数量成正比"""
+        start = bisect_right(self._log, (seq, "￿"))
+        result = [word_id for change_seq, word_id in self._log[start:] if self.changes.get(word_id) == change_seq]
+        if len(self._log) > 2 * len(self.changes):
+            # 同一单词的旧记录过多时压缩日志
+            self._log = sorted((change_seq, word_id) for word_id, change_seq in self.changes.items())
+        return result
+
+
+class SyncError(Exception):
+    """无法安全同步时抛出，此时两端都没有交换任何记录"""
+
+
+@dataclass
+class SyncResult:
+    """一次同步的统计"""
+    pulled: int = 0
+    pushed: int = 0
+    conflicts: int = 0
+    deleted: List[str] = field(default_factory=list)
+
+
+class SyncEngine:
+    """在两个 WordManager 之间交换增量变更。
+
+    每一端只发送对端上次同步之后的变更记录（单词或删除标记），
+    冲突按 record_stamp 决定，两端结果一致，因此同步后两边数据相同。
+    “远端”可以是另一个目录（如 U 盘或网盘同步目录）中的数据文件：
+        SyncEngine(WordManager("words_data.json"), WordManager("D:/sync/words_data.json")).sync()
+    """
+
+    def __init__(self, local, remote):
+        self.local = local
+        self.remote = remote
+
+    def sync(self) -> SyncResult:
+        for manager in (self.local, self.remote):
+            if manager.load_failed:
+                # 加载失败的一端不会保存接收的记录，继续同步会让对端误以为已送达
+                raise SyncError(f"数据加载失败，无法同步: {manager.data_file}")
+        local_state, remote_state = self.local.sync_state, self.remote.sync_state
+        if local_state.store_id == remote_state.store_id:
+            raise SyncError("两端的存储ID相同（可能是同一个词库或未识别出的副本），无法同步")
+        to_remote = self.local.changes_since(local_state.peers.get(remote_state.store_id, 0))
+        to_local = self.remote.changes_since(remote_state.peers.get(local_state.store_id, 0))
+
+        # 两端自上次同步后都修改过、且内容不同的记录视为冲突
+        remote_stamps = {record["id"]: record_stamp(record) for record in to_local}
+        conflicts = sum(1 for record in to_remote
+                        if record["id"] in remote_stamps and remote_stamps[record["id"]] != record_stamp(record))
+
+        pushed, _ = self.remote.apply_remote_changes(to_remote)
+        pulled, deleted = self.local.apply_remote_changes(to_local)
+
+        # 对端已把接受的记录写入磁盘后，才认为它包含本端截至当前序号的全部变更（包括刚刚接受的记录），
+        # 下次不再发送；保存失败时保留原水位，下次同步重新发送
+        if self.remote.data_saved():
+            local_state.peers[remote_state.store_id] = local_state.seq
+        if self.local.data_saved():
+            remote_state.peers[local_state.store_id] = remote_state.seq
+        self.local.save_sync_state()
+        self.remote.save_sync_state()
+        return SyncResult(pulled=pulled, pushed=pushed, conflicts=conflicts, deleted=deleted)
+
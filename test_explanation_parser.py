@@ -0,0 +1,38 @@
+"""解释解析测试：使用自带词库中的解释文本。
+
+运行：python -m unittest test_explanation_parser  或  python -m pytest test_explanation_parser.py
+"""
+import unittest
+
+from explanation_parser import parse_explanation
+
+# words_data.json 中 "連れる" 的解释
+TSURERU = ('[つれる] [tsureru] ◎ \n【自他・一段/二类】\n1.带，领；\n（常用"に連れて"的形式）伴随着，跟随。\n\n'
+           '他动词・一段/二类\n同行者として伴う。\n\n犬を連れて散歩に行く。 \n\n拉着狗去散步。\n\n'
+           '自动词・一段/二类\n《「…に連れ（て）」の形で》そうなるに従って。それと共に。\n\n'
+           '時がたつに連れて悲しみが薄らぐ。 \n\n随着时间的推移，悲哀会淡化。')
+
+
+class ParseExplanationTest(unittest.TestCase):
+    def test_sense_continuation_and_pos_lines(self):
+        parsed = parse_explanation(TSURERU)
+
+        self.assertEqual(parsed.readings, ("つれる",))
+        # 不带【】的词性行和【】一样是词性，不会被当作中文释义
+        self.assertEqual(parsed.pos_tags, ("自他・一段/二类", "他动词・一段/二类", "自动词・一段/二类"))
+        # 编号释义的续行虽然引用了日语，仍属于该释义
+        self.assertEqual(parsed.senses, ('带，领；（常用"に連れて"的形式）伴随着，跟随。',))
+        self.assertEqual(parsed.definitions, ())
+        self.assertEqual(parsed.examples, (("犬を連れて散歩に行く。", "拉着狗去散步。"),
+                                           ("時がたつに連れて悲しみが薄らぐ。", "随着时间的推移，悲哀会淡化。")))
+
+    def test_japanese_line_after_sense_is_not_continuation(self):
+        parsed = parse_explanation("[まかせる]\n1.委托；托付；交给。\nその件は僕に全権を任せておけ。\n"
+                                   "Leave that matter entirely to me.")
+
+        self.assertEqual(parsed.senses, ("委托；托付；交给。",))
+        self.assertEqual(parsed.definitions, (("その件は僕に全権を任せておけ。", "Leave that matter entirely to me."),))
+
+
+if __name__ == "__main__":
+    unittest.main()
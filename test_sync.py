@@ -0,0 +1,197 @@
+"""同步测试：用两个（或三个）本地目录中的数据文件模拟本地与远端存储。
+
+运行：python -m unittest test_sync  或  python -m pytest test_sync.py
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from dataclasses import asdict
+
+from sync import SyncEngine, SyncError
+from word_manager import WordManager
+
+
+class SyncTest(unittest.TestCase):
+    def setUp(self):
+        self.work_dir = tempfile.mkdtemp()
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.close()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+    def open_store(self, name: str) -> WordManager:
+        """打开（或重新打开）某个目录中的词库"""
+        directory = os.path.join(self.work_dir, name)
+        os.makedirs(directory, exist_ok=True)
+        manager = WordManager(os.path.join(directory, "words_data.json"))
+        self.managers.append(manager)
+        return manager
+
+    def contents(self, manager: WordManager):
+        return sorted((asdict(word) for word in manager.words), key=lambda word: word["id"])
+
+    def assert_same(self, *managers: WordManager):
+        expected = self.contents(managers[0])
+        for manager in managers[1:]:
+            self.assertEqual(self.contents(manager), expected)
+
+    def test_first_sync_copies_everything(self):
+        local, remote = self.open_store("local"), self.open_store("remote")
+        local.add_word("使い分ける", "vt", "[つかいわける]")
+        local.add_word("天意", "n", "[てんい]")
+
+        result = SyncEngine(local, remote).sync()
+
+        self.assertEqual(result.pushed, 2)
+        self.assertEqual(result.pulled, 0)
+        self.assert_same(local, remote)
+        # 没有新变更时再次同步不传输任何记录
+        result = SyncEngine(local, remote).sync()
+        self.assertEqual((result.pushed, result.pulled), (0, 0))
+
+    def test_concurrent_edits_resolve_identically(self):
+        local, remote = self.open_store("local"), self.open_store("remote")
+        word = local.add_word("寄る", "vi", "[よる]")
+        SyncEngine(local, remote).sync()
+
+        local.update_word(word.id, explanation="本地修改")
+        remote.update_word(word.id, explanation="远端修改一")
+        remote.update_word(word.id, explanation="远端修改二")
+
+        result = SyncEngine(local, remote).sync()
+
+        self.assertEqual(result.conflicts, 1)
+        # 远端的逻辑时钟更大，远端的修改获胜
+        self.assertEqual(local.get_word_by_id(word.id).explanation, "远端修改二")
+        self.assert_same(local, remote)
+
+    def test_newer_edit_beats_older_delete(self):
+        local, remote = self.open_store("local"), self.open_store("remote")
+        kept = local.add_word("当る", "vi", "[あたる]")
+        dropped = local.add_word("断る", "vt", "[ことわる]")
+        SyncEngine(local, remote).sync()
+
+        local.delete_words([kept.id, dropped.id])
+        remote.update_word(kept.id, explanation="第一次修改")
+        remote.update_word(kept.id, explanation="第二次修改")
+        remote.update_word(kept.id, explanation="第三次修改")
+
+        result = SyncEngine(local, remote).sync()
+
+        # kept 在远端的修改比本地的删除更新，恢复到两端；dropped 没有被修改，两端都删除
+        self.assertEqual(local.get_word_by_id(kept.id).explanation, "第三次修改")
+        self.assertIsNone(remote.get_word_by_id(dropped.id))
+        self.assertEqual(result.deleted, [])
+        self.assert_same(local, remote)
+
+    def test_add_on_one_side_and_reload_from_disk(self):
+        local, remote = self.open_store("local"), self.open_store("remote")
+        local.add_word("持ち", "n", "[もち]")
+        SyncEngine(local, remote).sync()
+
+        added = remote.add_word("発音", "n", "はつおん")
+        result = SyncEngine(local, remote).sync()
+
+        self.assertEqual((result.pulled, result.pushed), (1, 0))
+        self.assertIsNotNone(local.get_word_by_id(added.id))
+        self.assert_same(local, remote)
+
+        # 从磁盘重新加载后两端内容仍然一致，再同步也没有需要传输的记录
+        reloaded_local, reloaded_remote = self.open_store("local"), self.open_store("remote")
+        self.assert_same(local, reloaded_local, reloaded_remote)
+        result = SyncEngine(reloaded_local, reloaded_remote).sync()
+        self.assertEqual((result.pushed, result.pulled), (0, 0))
+
+    def test_third_store_relays_changes(self):
+        first, second, third = self.open_store("a"), self.open_store("b"), self.open_store("c")
+        word = first.add_word("代替 する", "vt", "[だいたい]")
+        SyncEngine(first, second).sync()
+        SyncEngine(second, third).sync()
+        self.assert_same(first, second, third)
+
+        # third 的修改经由 second 传回 first
+        third.update_word(word.id, explanation="经由中转")
+        added = third.add_word("太陽", "n", "[たいよう]")
+        SyncEngine(second, third).sync()
+        SyncEngine(first, second).sync()
+
+        self.assertEqual(first.get_word_by_id(word.id).explanation, "经由中转")
+        self.assertIsNotNone(first.get_word_by_id(added.id))
+        self.assert_same(first, second, third)
+
+        # first 的删除同样经由 second 到达 third
+        first.delete_words([added.id])
+        SyncEngine(first, second).sync()
+        SyncEngine(second, third).sync()
+        self.assertIsNone(third.get_word_by_id(added.id))
+        self.assert_same(first, second, third)
+
+    def test_store_that_failed_to_load_is_not_synced(self):
+        local, remote = self.open_store("local"), self.open_store("remote")
+        remote.add_word("持ち", "n", "[もち]")
+        remote.close()
+        with open(remote.data_file, 'w', encoding='utf-8') as f:
+            f.write('[{"id": ')
+        broken = self.open_store("remote")
+        self.assertTrue(broken.load_failed)
+
+        added = local.add_word("天意", "n", "[てんい]")
+        with self.assertRaises(SyncError):
+            SyncEngine(local, broken).sync()
+        self.assertEqual(local.sync_state.peers, {})
+
+        # 修复数据文件后，之前的变更仍会发送
+        with open(remote.data_file, 'w', encoding='utf-8') as f:
+            f.write("[]")
+        repaired = self.open_store("remote")
+        SyncEngine(local, repaired).sync()
+        self.assertIsNotNone(repaired.get_word_by_id(added.id))
+
+    def test_watermark_waits_for_remote_save(self):
+        local, remote = self.open_store("local"), self.open_store("remote")
+        added = local.add_word("天意", "n", "[てんい]")
+
+        def fail(words, dirty_types=None):
+            raise OSError("磁盘已满")
+        save = remote.storage.save
+        remote.storage.save = fail
+        SyncEngine(local, remote).sync()
+        self.assertNotIn(remote.sync_state.store_id, local.sync_state.peers)
+
+        # 远端保存恢复后重新同步，记录再次发送并写入磁盘
+        remote.storage.save = save
+        reopened = self.open_store("remote")
+        self.assertIsNone(reopened.get_word_by_id(added.id))
+        SyncEngine(local, reopened).sync()
+        self.assertIsNotNone(self.open_store("remote").get_word_by_id(added.id))
+
+    def test_copied_store_gets_its_own_id(self):
+        original, hub = self.open_store("a"), self.open_store("c")
+        original.add_word("持ち", "n", "[もち]")
+        original.close()
+        # 把整个目录复制到另一处，例如另一台电脑
+        shutil.copytree(os.path.join(self.work_dir, "a"), os.path.join(self.work_dir, "b"))
+        copy = self.open_store("b")
+        self.assertNotEqual(copy.sync_state.store_id, original.sync_state.store_id)
+
+        added = hub.add_word("天意", "n", "[てんい]")
+        SyncEngine(original, hub).sync()
+        SyncEngine(copy, hub).sync()
+
+        self.assertIsNotNone(copy.get_word_by_id(added.id))
+        self.assert_same(original, copy, hub)
+        # 重新加载副本时ID保持不变
+        self.assertEqual(self.open_store("b").sync_state.store_id, copy.sync_state.store_id)
+
+    def test_same_store_id_is_refused(self):
+        local, remote = self.open_store("local"), self.open_store("remote")
+        remote.sync_state.store_id = local.sync_state.store_id
+        with self.assertRaises(SyncError):
+            SyncEngine(local, remote).sync()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,10 +2,24 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 from datetime import datetime
 import traceback
+import multiprocessing
+
+from collections import deque
 
 from word_manager import WordManager, WordType
 from logger import logger
 
+
+def format_word_detail(word):
+    """生成单词详情文本"""
+    detail_info = f"日语单词：{word.japanese}\n\n"
+    detail_info += f"词性：{word.word_type}\n\n"
+    detail_info += f"解释：\n{word.explanation}\n\n"
+    detail_info += f"状态：{'已记住' if word.remembered else '未记住'}\n\n"
+    if word.last_review_time:
+        detail_info += f"最后复习：{word.last_review_time}"
+    return detail_info
+
 class JapaneseWordApp:
     def __init__(self, root):
         self.root = root
@@ -13,6 +27,8 @@ class JapaneseWordApp:
         self.root.geometry("1000x600")
         
         self.word_manager = WordManager()
+        if self.word_manager.load_failed:
+            messagebox.showerror("错误", "单词数据加载失败，本次运行中的修改不会保存。详情请查看 app.log 文件。")
         self.selected_word_ids = []  # 存储选中的单词ID
         self.current_word = None
         self.current_search_keyword = ""  # 当前搜索关键词
@@ -23,6 +39,11 @@ class JapaneseWordApp:
         self.setup_ui()
         self.refresh_type_list()
 
+    def on_close(self):
+        """关闭窗口：保存索引缓存后退出"""
+        self.word_manager.close()
+        self.root.destroy()
+
     def toggle_dark_mode(self):
         """切换暗黑/明亮模式"""
         self.is_dark_mode = not self.is_dark_mode
@@ -173,6 +194,7 @@ class JapaneseWordApp:
         self.review_menubutton['menu'] = review_menu
         
         review_menu.add_command(label="随机复习", command=lambda: self.start_review_session(word_type=None))
+        review_menu.add_command(label="闪卡复习", command=self.start_flashcard_session)
         review_menu.add_separator()
         
         for word_type_enum in WordType:
@@ -265,11 +287,9 @@ class JapaneseWordApp:
             messagebox.showinfo("提示", "没有需要复习的单词。")
             return
         
-        # 更新被选中复习的单词的 last_review_time
+        # 更新被选中复习的单词的 last_review_time（批量更新，只保存一次）
         today_iso = datetime.now().date().isoformat()
-        for word in self.review_words:
-            self.word_manager.update_word(word.id, last_review_time=today_iso)
-            word.last_review_time = today_iso # 同时更新本地对象状态
+        self.word_manager.update_words({word.id: {"last_review_time": today_iso} for word in self.review_words})
 
         self.is_review_mode = True
         self.review_menubutton.pack_forget()
@@ -279,8 +299,25 @@ class JapaneseWordApp:
         self.type_listbox.selection_set(0)
         self.on_type_select(None)
 
+    def start_flashcard_session(self, word_type=None):
+        """开始闪卡复习"""
+        words = self.word_manager.get_review_words(count=FlashcardDialog.SESSION_SIZE, word_type=word_type)
+        if not words:
+            messagebox.showinfo("提示", "没有需要复习的单词。")
+            return
+
+        dialog = FlashcardDialog(self.root, self.word_manager, words)
+        if dialog.answered_count:
+            # 整个会话结束后只刷新一次界面
+            self.refresh_type_list()
+            self.on_type_select(None)
+            self.update_detail_display()
+
     def end_review_session(self):
         """结束复习会话"""
+        # 以结束时的记住状态作为本次复习的结果，批量提交到复习计划和复习记录
+        if self.review_words:
+            self.word_manager.apply_review_session({word.id: word.remembered for word in self.review_words})
         self.is_review_mode = False
         self.review_words = []
         self.end_review_button.pack_forget()
@@ -311,7 +348,7 @@ class JapaneseWordApp:
             list_items.append(f"搜索结果 ({search_count})")
         
         for word_type in WordType:
-            count = len(self.word_manager.get_words_by_type(word_type.value))
+            count = self.word_manager.count_words_by_type(word_type.value)
             list_items.append(f"{word_type.value} ({count})")
 
         for item in list_items:
@@ -405,14 +442,7 @@ class JapaneseWordApp:
         self.detail_text.delete(1.0, tk.END)
         
         if self.current_word:
-            detail_info = f"日语单词：{self.current_word.japanese}\n\n"
-            detail_info += f"词性：{self.current_word.word_type}\n\n"
-            detail_info += f"解释：\n{self.current_word.explanation}\n\n"
-            detail_info += f"状态：{'已记住' if self.current_word.remembered else '未记住'}\n\n"
-            if self.current_word.last_review_time:
-                detail_info += f"最后复习：{self.current_word.last_review_time}"
-            
-            self.detail_text.insert(1.0, detail_info)
+            self.detail_text.insert(1.0, format_word_detail(self.current_word))
             
             # 更新按钮状态和文本
             self.remember_button.config(state=tk.NORMAL)
@@ -519,6 +549,134 @@ class JapaneseWordApp:
                         self.refresh_word_list(word_type)
             self.update_detail_display()
 
+class FlashcardDialog:
+    """闪卡复习窗口。
+
+    预先渲染接下来 PREFETCH_COUNT 张卡片的正反面文本；答题结果先缓存在内存中，
+    空闲 IDLE_COMMIT_MS 毫秒或会话结束时再一次性提交，长时间复习也只写少量几次文件。
+    """
+
+    SESSION_SIZE = 50
+    PREFETCH_COUNT = 5
+    IDLE_COMMIT_MS = 30000
+
+    def __init__(self, parent, word_manager, words):
+        self.word_manager = word_manager
+        self.remaining = iter(words)
+        self.total = len(words)
+        self.prefetched = deque()
+        self.current = None
+        self.pending_answers = {}
+        self.answered_count = 0
+        self.session_id = word_manager.review_log.new_session_id()
+        self.idle_job = None
+
+        self.dialog = tk.Toplevel(parent)
+        self.dialog.title("闪卡复习")
+        self.dialog.geometry("500x400")
+        self.dialog.transient(parent)
+        self.dialog.grab_set()
+        self.dialog.protocol("WM_DELETE_WINDOW", self.finish)
+
+        self.setup_dialog_ui()
+        self.prefetch()
+        self.next_card()
+
+        self.dialog.geometry("+%d+%d" % (parent.winfo_rootx() + 50, parent.winfo_rooty() + 50))
+        self.dialog.wait_window()
+
+    def setup_dialog_ui(self):
+        main_frame = ttk.Frame(self.dialog, padding="20")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.progress_label = ttk.Label(main_frame)
+        self.progress_label.grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
+
+        self.card_text = tk.Text(main_frame, wrap=tk.WORD, state=tk.DISABLED)
+        self.card_text.grid(row=1, column=0, sticky="nsew", pady=(0, 5))
+
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=2, column=0, pady=(10, 0))
+
+        self.show_button = ttk.Button(button_frame, text="显示答案 (空格)", command=self.show_answer)
+        self.show_button.pack(side=tk.LEFT, padx=(0, 5))
+        self.remember_button = ttk.Button(button_frame, text="记住 (1)", command=lambda: self.answer(True))
+        self.remember_button.pack(side=tk.LEFT, padx=(0, 5))
+        self.forget_button = ttk.Button(button_frame, text="没记住 (2)", command=lambda: self.answer(False))
+        self.forget_button.pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="结束", command=self.finish).pack(side=tk.LEFT)
+
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(1, weight=1)
+
+        self.dialog.bind('<space>', lambda event: self.show_answer())
+        self.dialog.bind('1', lambda event: self.answer(True))
+        self.dialog.bind('2', lambda event: self.answer(False))
+
+    def prefetch(self):
+        """补足预取队列，每张卡片为 (单词, 正面文本, 背面文本)"""
+        while len(self.prefetched) < self.PREFETCH_COUNT:
+            word = next(self.remaining, None)
+            if word is None:
+                break
+            self.prefetched.append((word, word.japanese, format_word_detail(word)))
+
+    def set_card_text(self, text):
+        self.card_text.config(state=tk.NORMAL)
+        self.card_text.delete(1.0, tk.END)
+        self.card_text.insert(1.0, text)
+        self.card_text.config(state=tk.DISABLED)
+
+    def next_card(self):
+        """显示下一张卡片的正面"""
+        if not self.prefetched:
+            self.finish()
+            return
+        self.current = self.prefetched.popleft()
+        self.prefetch()
+        self.progress_label.config(text=f"{self.answered_count + 1} / {self.total}")
+        self.set_card_text(self.current[1])
+        self.show_button.config(state=tk.NORMAL)
+        self.remember_button.config(state=tk.DISABLED)
+        self.forget_button.config(state=tk.DISABLED)
+
+    def show_answer(self):
+        if not self.current:
+            return
+        self.set_card_text(self.current[2])
+        self.show_button.config(state=tk.DISABLED)
+        self.remember_button.config(state=tk.NORMAL)
+        self.forget_button.config(state=tk.NORMAL)
+
+    def answer(self, remembered):
+        """记录答案（只缓存在内存中）并进入下一张"""
+        if not self.current or str(self.remember_button['state']) == tk.DISABLED:
+            return
+        self.pending_answers[self.current[0].id] = remembered
+        self.answered_count += 1
+        self.schedule_idle_commit()
+        self.next_card()
+
+    def schedule_idle_commit(self):
+        if self.idle_job:
+            self.dialog.after_cancel(self.idle_job)
+        self.idle_job = self.dialog.after(self.IDLE_COMMIT_MS, self.commit_answers)
+
+    def commit_answers(self):
+        """把缓存的答案作为一批提交"""
+        self.idle_job = None
+        if self.pending_answers:
+            answers, self.pending_answers = self.pending_answers, {}
+            self.word_manager.apply_review_session(answers, session_id=self.session_id)
+
+    def finish(self):
+        """提交剩余答案并关闭窗口"""
+        if self.idle_job:
+            self.dialog.after_cancel(self.idle_job)
+        self.commit_answers()
+        self.current = None
+        self.dialog.destroy()
+
 class EditWordDialog:
     def __init__(self, parent, word_manager, word):
         self.word_manager = word_manager
@@ -693,7 +851,10 @@ def main():
     root = tk.Tk()
     root.report_callback_exception = global_exception_handler
     app = JapaneseWordApp(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_close)
     root.mainloop()
 
 if __name__ == "__main__":
+    # 打包为 exe 后，索引预处理的子进程需要由此进入
+    multiprocessing.freeze_support()
     main() 
\ No newline at end of file
@@ -1,5 +1,10 @@
 import sys
 import os
+import unicodedata
+
+# 片假名（ァ-ヶ）到平假名的映射
+KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
 
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
@@ -9,4 +14,10 @@ def resource_path(relative_path):
     else:
         # A normal .py script
         base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path) 
\ No newline at end of file
+    return os.path.join(base_path, relative_path) 
+
+
+def normalize_text(text):
+    """ 归一化文本：全角/半角折叠（NFKC）、转小写、片假名转平假名 """
+    text = unicodedata.normalize("NFKC", text).lower()
+    return text.translate(KATAKANA_TO_HIRAGANA)
@@ -1,13 +1,25 @@
-import json
 import os
+import threading
+from bisect import bisect_left
+import time
 from enum import Enum
-from dataclasses import dataclass, asdict
-from typing import List, Optional
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional, Tuple
 import uuid
 from datetime import datetime, date
-import random
 from logger import logger
-from utils import resource_path
+from utils import normalize_text, resource_path
+from result_cache import ResultCache
+from storage import ShardedStorage, SingleFileStorage
+from snapshot import COMPRESSIONS, SnapshotStorage, write_snapshot
+from review_log import ReviewLog
+from scheduler import create_scheduler
+from word_query import WordQuery
+from index_cache import DerivedIndexes, IndexCache, data_fingerprint
+from preprocess import DEFAULT_CHUNK_SIZE, build_derived_indexes, extend_indexes
+from search_index import example_search_text, word_reading, word_search_text
+from explanation_parser import ParsedExplanation, parse_explanation
+from sync import SyncState, record_stamp
 
 
 class WordType(Enum):
@@ -31,39 +43,220 @@ class Word:
     remembered: bool = False
     created_time: str = ""
     last_review_time: str = ""
+    # 同步用的修改戳：逻辑时钟和修改时间，旧数据文件中没有这两个字段时取默认值
+    modified_clock: int = 0
+    modified_time: str = ""
 
     def __post_init__(self):
         if not self.created_time:
             self.created_time = datetime.now().date().isoformat()
 
 
+# 可做范围查询的日期字段及其取值方式
+DATE_FIELDS = {
+    "created_time": lambda w: w.created_time,
+    "review_time": lambda w: w.last_review_time or w.created_time,
+}
+
+
+@dataclass
+class WordIndexes:
+    """由单词列表派生的内存索引，单词增删改时就地更新"""
+    words: List[Word] = field(default_factory=list)
+    by_type: Dict[str, List[Word]] = field(default_factory=dict)
+    by_remembered: Dict[bool, List[Word]] = field(default_factory=dict)
+    positions: Dict[str, int] = field(default_factory=dict)  # 单词ID -> 在 words 中的位置
+    # 字段名 -> (已排序的键列表, 对应顺序的单词列表)，只在范围查询需要时才排序
+    sorted_by: Dict[str, Tuple[List[str], List[Word]]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, words: List[Word]) -> "WordIndexes":
+        indexes = cls(words=words, by_remembered={True: [], False: []})
+        for position, word in enumerate(words):
+            indexes.positions[word.id] = position
+            indexes.by_type.setdefault(word.word_type, []).append(word)
+            indexes.by_remembered[bool(word.remembered)].append(word)
+        return indexes
+
+    def sorted_index(self, name: str) -> Tuple[List[str], List[Word]]:
+        """按日期字段排序的索引，首次使用时构建"""
+        if name not in self.sorted_by:
+            getter = DATE_FIELDS[name]
+            ordered = sorted(self.words, key=getter)
+            self.sorted_by[name] = ([getter(w) for w in ordered], ordered)
+        return self.sorted_by[name]
+
+    def add(self, word: Word):
+        """单词已追加到 words 末尾"""
+        self.positions[word.id] = len(self.words) - 1
+        self.by_type.setdefault(word.word_type, []).append(word)
+        self.by_remembered[bool(word.remembered)].append(word)
+        self.sorted_by.clear()
+
+    def remove(self, words: List[Word], removed: List[Word]):
+        """words 为删除 removed 之后的单词列表"""
+        removed_ids = {word.id for word in removed}
+        self.words = words
+        self.positions = {word.id: position for position, word in enumerate(words)}
+        for word_type in {word.word_type for word in removed}:
+            bucket = [word for word in self.by_type.get(word_type, ()) if word.id not in removed_ids]
+            if bucket:
+                self.by_type[word_type] = bucket
+            else:
+                self.by_type.pop(word_type, None)
+        for flag in {bool(word.remembered) for word in removed}:
+            self.by_remembered[flag] = [word for word in self.by_remembered[flag] if word.id not in removed_ids]
+        self.sorted_by.clear()
+
+    def update(self, word: Word, old_type: str, old_remembered: bool, dates_changed: bool):
+        """单词的类型、记住状态或日期被修改后调整所在的分组"""
+        if word.word_type != old_type:
+            self._move(self.by_type, old_type, word.word_type, word)
+            if not self.by_type[old_type]:
+                del self.by_type[old_type]
+        if bool(word.remembered) != old_remembered:
+            self._move(self.by_remembered, old_remembered, bool(word.remembered), word)
+        if dates_changed:
+            self.sorted_by.clear()
+
+    def _move(self, groups: Dict, old_key, new_key, word: Word):
+        """把单词从一个分组移到另一个分组，分组内保持 words 中的顺序"""
+        old_bucket = groups[old_key]
+        del old_bucket[next(i for i, item in enumerate(old_bucket) if item is word)]
+        new_bucket = groups.setdefault(new_key, [])
+        keys = [self.positions[item.id] for item in new_bucket]
+        new_bucket.insert(bisect_left(keys, self.positions[word.id]), word)
+
+
 class WordManager:
-    def __init__(self, data_file="words_data.json"):
+    def __init__(self, data_file="words_data.json", sharded: bool = False,
+                 load_workers: Optional[int] = None, load_executor: str = "serial",
+                 scheduler: str = "heuristic", storage_format: str = "json",
+                 index_workers: Optional[int] = None, index_chunk_size: int = DEFAULT_CHUNK_SIZE):
         self.data_file = resource_path(data_file)
+        self.single_storage = SingleFileStorage(self.data_file)
+        if sharded and storage_format != "json":
+            raise ValueError("分片存储不支持压缩快照格式")
+        if storage_format != "json":
+            # 压缩快照，如 words_data.json -> words_data.jwl.gz
+            self.storage = SnapshotStorage(self.data_file, storage_format)
+        elif sharded:
+            # 分片目录与数据文件同名，如 words_data.json -> words_data_shards/
+            shard_dir = os.path.splitext(self.data_file)[0] + "_shards"
+            self.storage = ShardedStorage(shard_dir, workers=load_workers, executor=load_executor)
+        else:
+            self.storage = self.single_storage
         self.words = []
+        self._dirty_types = None  # None 表示需要全部重写
+        # 数据文件存在但读取失败时为 True，此时不再保存，避免用空词库覆盖原有数据
+        self.load_failed = False
+        self._indexes: Optional[WordIndexes] = None
+        self._id_index: Dict[str, Word] = {}
+        # 单词ID -> (解析时的解释文本, 解析结果)，解释修改后按文本比较自动失效
+        self._parsed: Dict[str, Tuple[str, ParsedExplanation]] = {}
+        # 每次数据变更递增的代数；类型代数只在该类型的成员变化时递增，
+        # 文本代数只在日语或解释变化时递增，用于缓存的细粒度失效
+        self.generation = 0
+        self._type_generations: Dict[str, int] = {}
+        self._text_generation = 0
+        self.result_cache = ResultCache()
+        # 可持久化的派生索引（搜索索引、读音索引），缓存失效时在后台线程重建
+        self.index_cache = IndexCache(os.path.splitext(self.data_file)[0] + "_index_cache.pickle")
+        self._derived: Optional[DerivedIndexes] = None
+        self._pending_derived = None  # 后台线程构建完成的 (代数, 索引)
+        self._index_thread: Optional[threading.Thread] = None
+        self._index_failed = False
+        self._derived_saved_generation = None
+        # 重建索引和批量导入时的预处理进程数（None 为 CPU 核数，1 为串行）及每批单词数
+        self.index_workers = index_workers
+        self.index_chunk_size = index_chunk_size
+        self.startup_stats: Dict[str, object] = {}
+
+        start = time.perf_counter()
         self.load_data()
+        self.startup_stats["load_ms"] = (time.perf_counter() - start) * 1000
+        self._load_derived_indexes()
+        self.sync_state = SyncState(os.path.splitext(self.data_file)[0] + "_sync.json")
+        # 逻辑时钟：本地每次修改加一，接收远端修改时推进到不小于远端的值
+        self.clock = max([word.modified_clock for word in self.words] +
+                         [stamp[0] for stamp in self.sync_state.tombstones.values()], default=0)
+        if self.sync_state.is_new:
+            # 首次启用同步时，现有单词全部视为待发送的变更
+            for word in self.words:
+                self.sync_state.record_change(word.id)
+        self.review_log = ReviewLog(os.path.splitext(self.data_file)[0] + "_review_log")
+        # 复习算法：heuristic（原有算法）、sm2 或 fsrs
+        self.scheduler = create_scheduler(scheduler, os.path.splitext(self.data_file)[0] + "_schedule")
 
     def load_data(self):
         """从JSON文件加载数据"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.words = [Word(**word_data) for word_data in data]
-            except Exception as e:
-                logger.error(f"加载数据失败: {e}")
-                self.words = []
-        else:
+        try:
+            if self.storage is not self.single_storage and not self.storage.exists() \
+                    and self.single_storage.exists():
+                self._migrate_from_single_file()
+            else:
+                self.words = [Word(**word_data) for word_data in self.storage.load()]
+                self._dirty_types = set()
+            self.load_failed = False
+        except Exception as e:
+            logger.error(f"加载数据失败: {e}")
             self.words = []
+            self._dirty_types = set()
+            self.load_failed = True
+        self._id_index = {word.id: word for word in self.words}
+        self._parsed = {}
+        self._indexes = None
+        self._derived = None
+        self.result_cache.invalidate()
+        self._mark_changed(self._type_generations.keys(), text_changed=True)
+        # 磁盘上的数据对应的代数；加载失败时磁盘内容与内存不一致
+        self._data_saved_generation = None if self.load_failed else self.generation
 
     def save_data(self):
-        """保存数据到JSON文件"""
+        """保存数据到JSON文件（分片存储时只写有变更的分片）"""
+        if self.load_failed:
+            logger.error("数据加载失败，为避免覆盖原有数据，本次修改未保存")
+            return
         try:
-            data = [asdict(word) for word in self.words]
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self.storage.save(self.words, self._dirty_types)
+            self._dirty_types = set()
+            self._data_saved_generation = self.generation
         except Exception as e:
             logger.error(f"保存数据失败: {e}")
+        self.save_sync_state()
+
+    def save_sync_state(self):
+        """保存同步状态"""
+        if self.load_failed:
+            return
+        try:
+            self.sync_state.save()
+        except Exception as e:
+            logger.error(f"保存同步状态失败: {e}")
+
+    def _migrate_from_single_file(self):
+        """从单文件格式迁移到分片或压缩快照格式，原文件保留不动"""
+        self.words = [Word(**word_data) for word_data in self.single_storage.load()]
+        self.storage.save(self.words, None)
+        self._dirty_types = set()
+
+    def export_snapshot(self, path: str, compression: Optional[str] = None):
+        """导出压缩快照，压缩格式由扩展名（.jwl.gz / .jwl.xz）或 compression 参数决定"""
+        write_snapshot(path, self.words, compression)
+
+    def backup(self, compression: str = "gzip") -> Optional[str]:
+        """在数据文件旁的 backups 目录中创建带时间戳的压缩快照，返回备份路径"""
+        backup_dir = os.path.join(os.path.dirname(self.data_file), "backups")
+        stem = os.path.splitext(os.path.basename(self.data_file))[0]
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(backup_dir, f"{stem}-{timestamp}{COMPRESSIONS[compression][1]}")
+        try:
+            os.makedirs(backup_dir, exist_ok=True)
+            self.export_snapshot(path, compression)
+        except Exception as e:
+            logger.error(f"备份失败: {e}")
+            return None
+        return path
 
     def add_word(self, japanese: str, word_type: str, explanation: str) -> Word:
         """添加新单词"""
@@ -73,89 +266,400 @@ class WordManager:
             word_type=word_type,
             explanation=explanation
         )
-        self.words.append(word)
+        self._touch(word)
+        self._insert_words([word])
         self.save_data()
         return word
 
+    def add_words(self, entries: List[Tuple[str, str, str]]) -> List[Word]:
+        """批量添加单词 [(日语, 类型, 解释)]，派生索引由进程池分批构建后合并，只保存一次"""
+        words = []
+        for japanese, word_type, explanation in entries:
+            word = Word(id=str(uuid.uuid4()), japanese=japanese, word_type=word_type, explanation=explanation)
+            self._touch(word)
+            words.append(word)
+        if not words:
+            return words
+        self._insert_words(words, index=False)
+        if self._derived is not None:
+            extend_indexes(self._derived, words, self.index_workers, self.index_chunk_size)
+        self.save_data()
+        return words
+
+    def _insert_words(self, words: List[Word], index: bool = True):
+        """插入单词并更新索引（不保存）；index 为 False 时由调用方负责更新派生索引"""
+        for word in words:
+            self.words.append(word)
+            self._id_index[word.id] = word
+            if self._indexes is not None:
+                self._indexes.add(word)
+            if index:
+                self._index_word(word)
+            self.sync_state.tombstones.pop(word.id, None)
+            self.sync_state.record_change(word.id)
+        word_types = {word.word_type for word in words}
+        self._mark_changed(word_types, text_changed=True, dirty_types=word_types)
+
     def delete_words(self, word_ids: List[str]):
         """删除指定ID的单词"""
-        self.words = [word for word in self.words if word.id not in word_ids]
+        self._remove_words(word_ids)
         self.save_data()
 
+    def _remove_words(self, word_ids, tombstones: Optional[Dict[str, Tuple[int, str]]] = None):
+        """删除单词并记录删除标记（不保存）；tombstones 为远端传来的删除戳"""
+        word_ids = set(word_ids)
+        removed = [self._id_index[word_id] for word_id in word_ids if word_id in self._id_index]
+        deleted_types = {word.word_type for word in removed}
+        self.words = [word for word in self.words if word.id not in word_ids]
+        if self._indexes is not None:
+            self._indexes.remove(self.words, removed)
+        for word_id in word_ids:
+            word = self._id_index.pop(word_id, None)
+            if word:
+                self._unindex_word(word)
+                self._parsed.pop(word_id, None)
+            if tombstones and word_id in tombstones:
+                self.sync_state.tombstones[word_id] = tuple(tombstones[word_id])
+            elif word:
+                self.clock += 1
+                self.sync_state.tombstones[word_id] = (self.clock, datetime.now().isoformat(timespec='seconds'))
+            else:
+                continue
+            self.sync_state.record_change(word_id)
+        self._mark_changed(deleted_types, text_changed=True, dirty_types=deleted_types)
+
     def update_word(self, word_id: str, **kwargs):
         """更新单词信息"""
-        for word in self.words:
-            if word.id == word_id:
-                for key, value in kwargs.items():
-                    if hasattr(word, key):
-                        setattr(word, key, value)
-                break
-        self.save_data()
+        self.update_words({word_id: kwargs})
 
     def get_review_words(self, count: int = 10, word_type: Optional[str] = None) -> List[Word]:
-        """根据复习算法获取单词列表。如果得分最高的单词超过指定数量，则从相同分数的单词中随机选择。"""
-        today = date.today()
-        word_scores = []
-
+        """根据当前复习算法获取单词列表"""
         source_words = self.words
         if word_type:
-            source_words = [
-                word for word in self.words if word.word_type == word_type]
+            source_words = self.get_words_by_type(word_type)
 
         if not source_words:
             return []
 
-        for word in source_words:
-            try:
-                review_date_str = word.last_review_time or word.created_time
-                review_date = date.fromisoformat(review_date_str)
-                days_diff = (today - review_date).days
-            except (ValueError, TypeError):
-                days_diff = 365
-
-            x = 7 if not word.remembered else 0
-            score = days_diff + x
-            word_scores.append((score, word))
-
-        word_scores.sort(key=lambda x: x[0], reverse=True)
-
-        if len(word_scores) <= count:
-            return [word for score, word in word_scores]
-
-        words_by_score = {}
-        for score, word in word_scores:
-            if score not in words_by_score:
-                words_by_score[score] = []
-            words_by_score[score].append(word)
-
-        result_words = []
-        sorted_scores = sorted(words_by_score.keys(), reverse=True)
-
-        for score in sorted_scores:
-            words_in_group = words_by_score[score]
-            if len(result_words) + len(words_in_group) < count:
-                result_words.extend(words_in_group)
+        return self.scheduler.select(source_words, count, date.today())
+
+    def update_words(self, updates: Dict[str, dict]):
+        """批量更新单词信息 {单词ID: {字段: 值}}，只保存一次"""
+        self._apply_updates(updates, touch=True)
+        self.save_data()
+
+    def _apply_updates(self, updates: Dict[str, dict], touch: bool):
+        """修改单词字段并维护索引（不保存）；touch 为 False 时保留传入的修改戳"""
+        for word_id, fields in updates.items():
+            word = self.get_word_by_id(word_id)
+            if not word:
+                continue
+            old_type = word.word_type
+            old_remembered = bool(word.remembered)
+            text_changed = "japanese" in fields or "explanation" in fields
+            if text_changed:
+                self._unindex_word(word)
+            for key, value in fields.items():
+                if hasattr(word, key):
+                    setattr(word, key, value)
+            if text_changed:
+                self._index_word(word)
+            if self._indexes is not None:
+                self._indexes.update(word, old_type, old_remembered,
+                                     "created_time" in fields or "last_review_time" in fields)
+            if touch:
+                self._touch(word)
+            self.sync_state.record_change(word_id)
+            changed_types = {old_type, word.word_type} if word.word_type != old_type else set()
+            self._mark_changed(changed_types, text_changed=text_changed,
+                               dirty_types={old_type, word.word_type})
+
+    def _touch(self, word: Word):
+        """为本地修改分配新的修改戳"""
+        self.clock += 1
+        word.modified_clock = self.clock
+        word.modified_time = datetime.now().isoformat(timespec='seconds')
+
+    def changes_since(self, seq: int) -> List[dict]:
+        """返回本地序号 seq 之后的变更记录（单词或删除标记），供同步使用"""
+        records = []
+        for word_id in self.sync_state.changed_since(seq):
+            word = self._id_index.get(word_id)
+            if word is not None:
+                records.append({"id": word_id, "deleted": False, "word": asdict(word)})
+            elif word_id in self.sync_state.tombstones:
+                clock, time_str = self.sync_state.tombstones[word_id]
+                records.append({"id": word_id, "deleted": True, "clock": clock, "time": time_str})
+        return records
+
+    def apply_remote_changes(self, records: List[dict]) -> Tuple[int, List[str]]:
+        """合并远端变更记录，修改戳较新的一方获胜，只保存一次。
+
+        返回 (接受的记录数, 被删除的单词ID)。
+        """
+        inserts, updates, tombstones = [], {}, {}
+        for record in records:
+            word_id = record["id"]
+            word = self._id_index.get(word_id)
+            if word is not None:
+                local = {"id": word_id, "deleted": False, "word": asdict(word)}
+            elif word_id in self.sync_state.tombstones:
+                clock, time_str = self.sync_state.tombstones[word_id]
+                local = {"id": word_id, "deleted": True, "clock": clock, "time": time_str}
+            else:
+                local = None
+
+            remote_stamp = record_stamp(record)
+            self.clock = max(self.clock, remote_stamp[0])
+            if local is not None and record_stamp(local) >= remote_stamp:
+                continue
+
+            if record["deleted"]:
+                tombstones[word_id] = (record["clock"], record["time"])
+            elif word is not None:
+                updates[word_id] = record["word"]
             else:
-                num_to_add = count - len(result_words)
-                result_words.extend(random.sample(words_in_group, num_to_add))
-                break
+                inserts.append(Word(**record["word"]))
+
+        if inserts:
+            self._insert_words(inserts)
+        if updates:
+            self._apply_updates(updates, touch=False)
+        if tombstones:
+            self._remove_words(tombstones.keys(), tombstones)
+        accepted = len(inserts) + len(updates) + len(tombstones)
+        if accepted:
+            self.save_data()
+        return accepted, list(tombstones)
+
+    def apply_review_session(self, answers: Dict[str, bool], session_id: Optional[int] = None,
+                             today: Optional[date] = None) -> int:
+        """提交一次复习会话的全部答题结果 {单词ID: 是否记住}。
+
+        单词状态、复习计划和复习记录各只写一次，返回会话ID。
+        """
+        today = today or date.today()
+        answers = {word_id: remembered for word_id, remembered in answers.items() if word_id in self._id_index}
+        self.update_words({word_id: {"remembered": remembered, "last_review_time": today.isoformat()}
+                           for word_id, remembered in answers.items()})
+        self.scheduler.apply_answers(answers, today)
+        try:
+            self.scheduler.save(self._id_index)
+        except Exception as e:
+            logger.error(f"保存复习计划失败: {e}")
+        return self.record_reviews(answers, session_id, today)
+
+    def record_reviews(self, results: Dict[str, bool], session_id: Optional[int] = None,
+                       day: Optional[date] = None) -> int:
+        """记录一次复习会话的结果 {单词ID: 是否记住}，返回会话ID；day 默认为今天"""
+        if session_id is None:
+            session_id = self.review_log.new_session_id()
+        events = [(word_id, self._id_index[word_id].word_type, remembered)
+                  for word_id, remembered in results.items() if word_id in self._id_index]
+        try:
+            self.review_log.append(events, session_id, day)
+        except Exception as e:
+            logger.error(f"保存复习记录失败: {e}")
+        return session_id
 
-        return result_words
+    def get_review_statistics(self) -> Dict[str, object]:
+        """返回复习统计：每日复习数、各类型记住率和待复习积压量"""
+        return {
+            "total_reviews": len(self.review_log),
+            "reviews_per_day": self.review_log.reviews_per_day(),
+            "retention_by_type": self.review_log.retention_by_type(),
+            "backlog": self.review_log.backlog_size(self._id_index),
+        }
 
     def get_words_by_type(self, word_type: str) -> List[Word]:
         """获取指定类型的单词"""
-        return [word for word in self.words if word.word_type == word_type]
+        return list(self.result_cache.get_or_compute(
+            ("type", word_type), self._type_generations.get(word_type, 0),
+            lambda: tuple(self.get_indexes().by_type.get(word_type, ()))))
+
+    def count_words_by_type(self, word_type: str) -> int:
+        """获取指定类型的单词数量"""
+        return self.result_cache.get_or_compute(
+            ("count", word_type), self._type_generations.get(word_type, 0),
+            lambda: len(self.get_indexes().by_type.get(word_type, ())))
 
     def search_words(self, keyword: str) -> List[Word]:
         """搜索包含关键词的单词"""
         if not keyword:
             return []
         keyword = keyword.lower()
-        return [word for word in self.words if keyword in word.japanese.lower() or keyword in word.explanation.lower()]
+        return list(self.result_cache.get_or_compute(
+            ("search", keyword), self._text_generation, lambda: tuple(self._search(keyword))))
+
+    def _search(self, keyword: str) -> List[Word]:
+        """有搜索索引时只校验候选单词，否则全量扫描"""
+        words = self.words
+        derived = self.get_derived_indexes()
+        if derived is not None:
+            positions = self.get_indexes().positions
+            candidate_ids = [word_id for word_id in derived.search.candidates(keyword) if word_id in positions]
+            words = [self._id_index[word_id] for word_id in sorted(candidate_ids, key=positions.get)]
+        return [word for word in words if keyword in word.japanese.lower() or keyword in word.explanation.lower()]
+
+    def find_by_reading_prefix(self, prefix: str) -> List[Word]:
+        """查找读音以 prefix 开头的单词（假名不区分平片假名），按读音排序"""
+        prefix = normalize_text(prefix)
+        return list(self.result_cache.get_or_compute(
+            ("reading", prefix), self._text_generation, lambda: tuple(self._find_by_reading_prefix(prefix))))
+
+    def _find_by_reading_prefix(self, prefix: str) -> List[Word]:
+        """有读音索引时直接查找，后台构建尚未完成时扫描全部单词"""
+        derived = self.get_derived_indexes()
+        if derived is not None:
+            return [self._id_index[word_id] for word_id in derived.readings.with_prefix(prefix)
+                    if word_id in self._id_index]
+        keyed = []
+        for word in self.words:
+            key = normalize_text(word_reading(word, self.parse_explanation(word)))
+            if key and key.startswith(prefix):
+                keyed.append((key, word.id, word))
+        keyed.sort(key=lambda item: item[:2])
+        return [word for _, _, word in keyed]
+
+    def find_by_example(self, keyword: str) -> List[Word]:
+        """查找例句（日语句子或其翻译）包含关键词的单词"""
+        if not keyword:
+            return []
+        keyword = keyword.lower()
+        return list(self.result_cache.get_or_compute(
+            ("example", keyword), self._text_generation, lambda: tuple(self._find_by_example(keyword))))
+
+    def _find_by_example(self, keyword: str) -> List[Word]:
+        words = self.words
+        derived = self.get_derived_indexes()
+        if derived is not None:
+            positions = self.get_indexes().positions
+            candidate_ids = [word_id for word_id in derived.examples.candidates(keyword) if word_id in positions]
+            words = [self._id_index[word_id] for word_id in sorted(candidate_ids, key=positions.get)]
+        return [word for word in words if keyword in example_search_text(self.parse_explanation(word))]
+
+    def parse_explanation(self, word: Word) -> ParsedExplanation:
+        """返回单词解释的结构化内容（读音、词性、释义、例句），结果按单词缓存"""
+        cached = self._parsed.get(word.id)
+        if cached is None or cached[0] != word.explanation:
+            cached = self._parsed[word.id] = (word.explanation, parse_explanation(word.explanation))
+        return cached[1]
 
     def get_word_by_id(self, word_id: str) -> Optional[Word]:
         """根据ID获取单词"""
-        for word in self.words:
-            if word.id == word_id:
-                return word
-        return None
+        return self._id_index.get(word_id)
+
+    def _mark_changed(self, word_types, text_changed: bool = False, dirty_types=()):
+        """记录一次数据变更：递增代数、使相关缓存失效并标记需要保存的分片"""
+        self.generation += 1
+        if self._dirty_types is not None:
+            self._dirty_types.update(dirty_types)
+        for word_type in list(word_types):
+            self._type_generations[word_type] = self.generation
+        if text_changed:
+            self._text_generation = self.generation
+
+    def _index_word(self, word: Word):
+        if self._derived is not None:
+            parsed = self.parse_explanation(word)
+            self._derived.search.add(word.id, word_search_text(word))
+            self._derived.examples.add(word.id, example_search_text(parsed))
+            self._derived.readings.set(word.id, word_reading(word, parsed))
+
+    def _unindex_word(self, word: Word):
+        if self._derived is not None:
+            self._derived.search.remove(word.id, word_search_text(word))
+            self._derived.examples.remove(word.id, example_search_text(self.parse_explanation(word)))
+            self._derived.readings.remove(word.id)
+
+    def _load_derived_indexes(self):
+        """启动时优先读取索引缓存；缓存缺失或与数据文件不一致时在后台重建"""
+        start = time.perf_counter()
+        fingerprint = data_fingerprint(self.storage.source_files())
+        cached = self.index_cache.load(fingerprint)
+        if cached is not None:
+            self._derived = cached
+            self._derived_saved_generation = self.generation
+            self.startup_stats["index_source"] = "cache"
+            self.startup_stats["index_ms"] = (time.perf_counter() - start) * 1000
+        else:
+            self.startup_stats["index_source"] = "rebuild"
+            self._start_index_rebuild(fingerprint if self.data_saved() else None)
+
+    def _start_index_rebuild(self, fingerprint=None):
+        """在后台线程中重建派生索引，完成后由主线程在 get_derived_indexes 中采用"""
+        generation = self.generation
+        words = list(self.words)
+
+        def build():
+            start = time.perf_counter()
+            try:
+                indexes = build_derived_indexes(words, self.index_workers, self.index_chunk_size)
+            except Exception as e:
+                logger.error(f"构建索引失败: {e}")
+                self._index_failed = True
+                return
+            self.startup_stats.setdefault("index_ms", (time.perf_counter() - start) * 1000)
+            if fingerprint is not None:
+                self.index_cache.save(fingerprint, indexes)
+            self._pending_derived = (generation, indexes, fingerprint is not None)
+
+        self._index_thread = threading.Thread(target=build, daemon=True)
+        self._index_thread.start()
+
+    def rebuild_indexes(self) -> DerivedIndexes:
+        """在当前线程中用进程池完整重建派生索引并写入缓存"""
+        if self._index_thread is not None:
+            self._index_thread.join()
+        self._pending_derived = None
+        self._derived = build_derived_indexes(self.words, self.index_workers, self.index_chunk_size)
+        self._index_failed = False
+        if self.data_saved():
+            self.index_cache.save(data_fingerprint(self.storage.source_files()), self._derived)
+            self._derived_saved_generation = self.generation
+        return self._derived
+
+    def data_saved(self) -> bool:
+        """内存中的数据是否已全部写入磁盘；只有这时才能以数据文件的指纹保存索引缓存，
+        同步时对端也才能认为记录已送达"""
+        return self._data_saved_generation == self.generation
+
+    def get_derived_indexes(self) -> Optional[DerivedIndexes]:
+        """返回派生索引；后台重建尚未完成时返回 None，调用方应退回全量扫描"""
+        if self._derived is None and not self._index_failed:
+            pending, self._pending_derived = self._pending_derived, None
+            if pending is not None and pending[0] == self.generation:
+                generation, self._derived, saved = pending
+                if saved:
+                    self._derived_saved_generation = generation
+            elif self._index_thread is None or not self._index_thread.is_alive():
+                # 构建期间数据发生了变化，或尚未开始构建
+                self._start_index_rebuild()
+        return self._derived
+
+    def wait_for_indexes(self) -> Optional[DerivedIndexes]:
+        """等待后台索引构建完成"""
+        while self.get_derived_indexes() is None and self._index_thread.is_alive():
+            self._index_thread.join()
+        return self.get_derived_indexes()
+
+    def close(self):
+        """退出前把最新的派生索引写入缓存，下次启动即可直接读取"""
+        derived = self.wait_for_indexes()
+        if derived is not None and self._derived_saved_generation != self.generation and self.data_saved():
+            self.index_cache.save(data_fingerprint(self.storage.source_files()), derived)
+            self._derived_saved_generation = self.generation
+
+    def cache_stats(self):
+        """返回结果缓存的命中统计"""
+        return self.result_cache.stats()
+
+    def get_indexes(self) -> WordIndexes:
+        """获取内存索引，首次访问时构建，之后随单词增删改就地更新"""
+        if self._indexes is None:
+            self._indexes = WordIndexes.build(self.words)
+        return self._indexes
+
+    def query(self) -> WordQuery:
+        """创建组合查询，例如 query().type("vt").remembered(False).all()"""
+        return WordQuery(self)
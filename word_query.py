@@ -0,0 +1,239 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, List, Optional, Tuple
+
+from search_index import example_search_text, word_reading
+from utils import normalize_text
+
+# 可排序的字段及其取值方式
+SORT_KEYS = {
+    "japanese": lambda word: word.japanese,
+    "word_type": lambda word: word.word_type,
+    "remembered": lambda word: word.remembered,
+    "created_time": lambda word: word.created_time,
+    "last_review_time": lambda word: word.last_review_time,
+    "review_time": lambda word: word.last_review_time or word.created_time,
+}
+
+TEXT_FIELDS = ("japanese", "explanation")
+
+
+@dataclass
+class Predicate:
+    """单个查询条件"""
+    kind: str
+    description: str
+    test: Callable
+    value: object = None
+
+
+@dataclass
+class QueryPlan:
+    """查询计划：选用的访问路径、预估行数和剩余的过滤条件"""
+    access: str
+    estimated_rows: int
+    candidates: Callable
+    residual: List[Predicate] = field(default_factory=list)
+    alternatives: List[Tuple[str, int]] = field(default_factory=list)
+
+
+class WordQuery:
+    """可组合的单词查询。
+
+    通过链式调用添加条件，例如：
+        manager.query().type("vt").remembered(False).not_reviewed_for(30).contains("例")
+    执行时会根据 WordManager 的索引选择最有选择性的访问路径。
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.predicates: List[Predicate] = []
+        self.sort_field: Optional[str] = None
+        self.sort_reverse = False
+        self.limit_count: Optional[int] = None
+
+    def type(self, word_type: str) -> "WordQuery":
+        """限定单词类型"""
+        self.predicates.append(Predicate(
+            "type", f"word_type == {word_type!r}",
+            lambda word: word.word_type == word_type, word_type))
+        return self
+
+    def remembered(self, flag: bool = True) -> "WordQuery":
+        """限定记住状态"""
+        flag = bool(flag)
+        self.predicates.append(Predicate(
+            "remembered", f"remembered == {flag}",
+            lambda word: word.remembered == flag, flag))
+        return self
+
+    def created_between(self, start: Optional[str] = None, end: Optional[str] = None) -> "WordQuery":
+        """限定添加日期范围（ISO 日期字符串，包含两端）"""
+        return self._date_range("created", "created_time",
+                                lambda word: word.created_time, start, end)
+
+    def reviewed_between(self, start: Optional[str] = None, end: Optional[str] = None) -> "WordQuery":
+        """限定复习日期范围，从未复习的单词按添加日期计算（与复习算法一致）"""
+        return self._date_range("reviewed", "review_time",
+                                lambda word: word.last_review_time or word.created_time, start, end)
+
+    def not_reviewed_for(self, days: int) -> "WordQuery":
+        """限定超过指定天数未复习的单词"""
+        cutoff = (date.today() - timedelta(days=days + 1)).isoformat()
+        return self.reviewed_between(end=cutoff)
+
+    def contains(self, keyword: str, fields=TEXT_FIELDS) -> "WordQuery":
+        """限定指定字段包含关键词（不区分大小写）"""
+        keyword = keyword.lower()
+        fields = tuple(fields)
+        self.predicates.append(Predicate(
+            "text", f"{keyword!r} in {'/'.join(fields)}",
+            lambda word: any(keyword in getattr(word, name).lower() for name in fields),
+            (keyword, fields)))
+        return self
+
+    def example_contains(self, keyword: str) -> "WordQuery":
+        """限定例句（日语句子或其翻译）包含关键词（不区分大小写）"""
+        keyword = keyword.lower()
+        manager = self.manager
+        self.predicates.append(Predicate(
+            "example", f"{keyword!r} in examples",
+            lambda word: keyword in example_search_text(manager.parse_explanation(word)), keyword))
+        return self
+
+    def reading_startswith(self, prefix: str) -> "WordQuery":
+        """限定读音前缀（不区分平片假名）"""
+        prefix = normalize_text(prefix)
+        manager = self.manager
+        self.predicates.append(Predicate(
+            "reading", f"reading startswith {prefix!r}",
+            lambda word: normalize_text(word_reading(word, manager.parse_explanation(word))).startswith(prefix),
+            prefix))
+        return self
+
+    def where(self, test: Callable, description: str = "custom") -> "WordQuery":
+        """添加自定义条件，只能通过扫描执行"""
+        self.predicates.append(Predicate("custom", description, test))
+        return self
+
+    def order_by(self, field_name: str, reverse: bool = False) -> "WordQuery":
+        """设置排序字段"""
+        if field_name not in SORT_KEYS:
+            raise ValueError(f"不支持的排序字段: {field_name}")
+        self.sort_field = field_name
+        self.sort_reverse = reverse
+        return self
+
+    def limit(self, count: int) -> "WordQuery":
+        """限制返回数量"""
+        self.limit_count = count
+        return self
+
+    def _date_range(self, kind, index_name, getter, start, end):
+        low = start or ""
+        high = end or "￿"
+        self.predicates.append(Predicate(
+            kind, f"{start or '-∞'} <= {index_name} <= {end or '+∞'}",
+            lambda word: low <= getter(word) <= high, (index_name, low, high)))
+        return self
+
+    def _access_paths(self):
+        """列出每个可走索引的条件对应的访问路径及其精确行数"""
+        indexes = self.manager.get_indexes()
+        paths = []
+        for predicate in self.predicates:
+            if predicate.kind == "type":
+                bucket = indexes.by_type.get(predicate.value, [])
+                paths.append((f"type index [{predicate.value}]", len(bucket),
+                              lambda bucket=bucket: bucket, predicate))
+            elif predicate.kind == "remembered":
+                bucket = indexes.by_remembered.get(predicate.value, [])
+                paths.append((f"remembered index [{predicate.value}]", len(bucket),
+                              lambda bucket=bucket: bucket, predicate))
+            elif predicate.kind in ("created", "reviewed"):
+                index_name, low, high = predicate.value
+                keys, words = indexes.sorted_index(index_name)
+                lo = bisect_left(keys, low)
+                hi = bisect_right(keys, high)
+                paths.append((f"{index_name} range index [{lo}:{hi}]", hi - lo,
+                              lambda words=words, lo=lo, hi=hi: words[lo:hi], predicate))
+            elif predicate.kind == "text" and predicate.value[1] == TEXT_FIELDS and predicate.value[0]:
+                # 空关键词匹配所有单词，而索引中没有对应的条目，只能扫描（例句、读音条件同理）
+                derived = self.manager.get_derived_indexes()
+                if derived is not None:
+                    # 倒排索引只给出候选集，文本条件仍作为过滤器校验
+                    ids = [i for i in derived.search.candidates(predicate.value[0]) if i in indexes.positions]
+                    ids.sort(key=indexes.positions.get)
+                    paths.append(("search index", len(ids),
+                                  lambda ids=ids: [self.manager.get_word_by_id(i) for i in ids], None))
+            elif predicate.kind == "example" and predicate.value:
+                derived = self.manager.get_derived_indexes()
+                if derived is not None:
+                    ids = [i for i in derived.examples.candidates(predicate.value) if i in indexes.positions]
+                    ids.sort(key=indexes.positions.get)
+                    paths.append(("example index", len(ids),
+                                  lambda ids=ids: [self.manager.get_word_by_id(i) for i in ids], None))
+            elif predicate.kind == "reading" and predicate.value:
+                derived = self.manager.get_derived_indexes()
+                if derived is not None:
+                    # 读音索引的结果是精确的，无需再作为过滤器校验
+                    ids = [i for i in derived.readings.with_prefix(predicate.value) if i in indexes.positions]
+                    ids.sort(key=indexes.positions.get)
+                    paths.append((f"reading index [{predicate.value}]", len(ids),
+                                  lambda ids=ids: [self.manager.get_word_by_id(i) for i in ids], predicate))
+        return paths
+
+    def plan(self) -> QueryPlan:
+        """选择预估行数最少的访问路径，其余条件作为过滤器"""
+        words = self.manager.words
+        best = ("full scan", len(words), lambda: words, None)
+        paths = self._access_paths()
+        for path in paths:
+            if path[1] < best[1]:
+                best = path
+        access, rows, candidates, used = best
+        residual = [p for p in self.predicates if p is not used]
+        # 文本条件代价最高，放在最后执行
+        residual.sort(key=lambda p: p.kind in ("text", "example", "reading", "custom"))
+        alternatives = [(name, count) for name, count, _, _ in paths if name != access]
+        return QueryPlan(access, rows, candidates, residual, alternatives)
+
+    def explain(self) -> str:
+        """返回查询计划的文字描述"""
+        plan = self.plan()
+        lines = [f"访问路径: {plan.access} (预估 {plan.estimated_rows} 行, 共 {len(self.manager.words)} 行)"]
+        for name, count in plan.alternatives:
+            lines.append(f"  备选: {name} ({count} 行)")
+        for predicate in plan.residual:
+            lines.append(f"过滤: {predicate.description}")
+        if self.sort_field:
+            lines.append(f"排序: {self.sort_field} {'DESC' if self.sort_reverse else 'ASC'}")
+        if self.limit_count is not None:
+            lines.append(f"限制: {self.limit_count}")
+        return "\n".join(lines)
+
+    def all(self) -> List:
+        """执行查询并返回单词列表"""
+        plan = self.plan()
+        tests = [p.test for p in plan.residual]
+        result = []
+        stop_early = self.limit_count is not None and self.sort_field is None
+        for word in plan.candidates():
+            if all(test(word) for test in tests):
+                result.append(word)
+                if stop_early and len(result) >= self.limit_count:
+                    break
+        if self.sort_field:
+            result.sort(key=SORT_KEYS[self.sort_field], reverse=self.sort_reverse)
+        if self.limit_count is not None:
+            result = result[:self.limit_count]
+        return result
+
+    def count(self) -> int:
+        """返回匹配的单词数量"""
+        plan = self.plan()
+        tests = [p.test for p in plan.residual]
+        if not tests:
+            return plan.estimated_rows
+        return sum(1 for word in plan.candidates() if all(test(word) for test in tests))